@@ -0,0 +1,6 @@
+"""
+Benchmarks for the TipTop platform.
+
+Run a benchmark from the repository root, e.g.:
+    python -m benchmarks.bench_user_index
+"""
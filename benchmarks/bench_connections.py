@@ -0,0 +1,135 @@
+"""
+Benchmark suite for Connections over the synthetic graphs of
+benchmarks.generators, for regression tracking and backend comparisons.
+
+For every graph kind, size and backend it records the build time,
+the mean time of mutual_friends over random pairs of users, and the time of
+get_ai_clusters_1008_2085 and get_ai_clusters_1054. Those queries only read
+the bot and cluster state the build computed, so the clustering work itself
+is timed apart: the scan for one-sided follows and mutual components
+(_scan), and the FIT1054 labelling from its result (_label_clusters_1054).
+The queries are also timed again after an edit would have been made, when
+the bots and cluster leaders are gathered again from the per-user flags.
+Results are written as JSON (to stdout, or --output); progress goes to stderr.
+
+    python -m benchmarks.bench_connections --sizes 1000 10000 100000 1000000
+    python -m benchmarks.bench_connections --kinds sparse --backends csr --output results.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from benchmarks.generators import GENERATORS
+from connections import Connections
+
+
+def timed(function, *args):
+    """ (seconds, result) of one call. """
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def count_clusters(clusters):
+    """ (number of clusters, number of users in them). """
+    number = members = 0
+    for cluster in clusters:
+        number += 1
+        members += len(cluster)
+    return number, members
+
+
+def run(kind, users, backend, seed, pairs):
+    """ Benchmark one graph with one backend; returns a JSON-ready record. """
+    usernames, rows = GENERATORS[kind](users, seed)
+    build, conn = timed(Connections, usernames, rows, False, backend)
+
+    # half random pairs, half a user and someone they follow
+    rng = random.Random(seed)
+    queries = []
+    for q in range(pairs):
+        i = rng.randrange(users)
+        if q % 2 and len(rows[i]) > 0:
+            queries.append((usernames[i], rows[i][rng.randrange(len(rows[i]))]))
+        else:
+            queries.append((usernames[i], usernames[rng.randrange(users)]))
+    start = time.perf_counter()
+    mutual = sum(conn.mutual_friends(a, b) for a, b in queries)
+    per_query = (time.perf_counter() - start) / pairs
+
+    time_1008, clusters_1008 = timed(conn.get_ai_clusters_1008_2085)
+    time_1054, clusters_1054 = timed(conn.get_ai_clusters_1054)
+
+    # the clustering work hidden in the build
+    scan, (unreciprocated_out, _, mutual_degree, components) = timed(conn._scan)
+    label, _ = timed(conn._label_clusters_1054, components, mutual_degree, unreciprocated_out)
+
+    # the queries as they run after an edit: no cached results, and the bot
+    # and leader indices gathered again
+    conn._graph_changed()
+    edited_1008, _ = timed(conn.get_ai_clusters_1008_2085)
+    conn._graph_changed()
+    edited_1054, _ = timed(conn.get_ai_clusters_1054)
+    return {
+        "kind": kind,
+        "users": users,
+        "follows": conn._graph.number_of_edges(),
+        "backend": backend,
+        "build_s": build,
+        "mutual_friends_us": per_query * 1e6,
+        "mutual_pairs_found": mutual,
+        "clusters_1008_2085_s": time_1008,
+        "clusters_1008_2085": count_clusters(clusters_1008),
+        "clusters_1054_s": time_1054,
+        "clusters_1054": count_clusters(clusters_1054),
+        "scan_s": scan,
+        "label_1054_s": label,
+        "clusters_1008_2085_after_edit_s": edited_1008,
+        "clusters_1054_after_edit_s": edited_1054,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--kinds", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    p.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    p.add_argument("--backends", nargs="+", choices=Connections.BACKENDS, default=list(Connections.BACKENDS))
+    p.add_argument("--seed", type=int, default=1008)
+    p.add_argument("--pairs", type=int, default=10_000, help="mutual_friends queries per graph")
+    p.add_argument("--output", help="write the JSON here instead of stdout")
+    args = p.parse_args()
+
+    results = []
+    for kind in args.kinds:
+        for users in args.sizes:
+            for backend in args.backends:
+                record = run(kind, users, backend, args.seed, args.pairs)
+                results.append(record)
+                print(f"{kind:11} users={users:<8} {backend:5} build {record['build_s']:7.2f} s  "
+                      f"mutual_friends {record['mutual_friends_us']:6.2f} us  "
+                      f"1008 {record['clusters_1008_2085_s'] * 1e3:8.1f} ms  "
+                      f"1054 {record['clusters_1054_s'] * 1e3:8.1f} ms  "
+                      f"scan {record['scan_s'] * 1e3:8.1f} ms  "
+                      f"label {record['label_1054_s'] * 1e3:7.1f} ms  "
+                      f"after edit 1008 {record['clusters_1008_2085_after_edit_s'] * 1e3:8.1f} ms  "
+                      f"1054 {record['clusters_1054_after_edit_s'] * 1e3:8.1f} ms", file=sys.stderr)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark of the Connections graph backends ("lists" and "csr").
+
+Builds the same random follow graph with each backend and reports the
+build time, the memory held by the finished Connections object (username
+directory and per-user state included), and the time of a full neighbour
+scan.
+
+    python -m benchmarks.bench_graph_backends --users 100000 --degree 10
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from connections import Connections
+from data_structures import ArrayR
+
+
+def random_graph(users, degree, seed):
+    rng = random.Random(seed)
+    usernames = ArrayR.from_list([f"user{i}" for i in range(users)])
+    rows = []
+    for i in range(users):
+        # pick from everyone but user i, who cannot follow themselves
+        picks = [rng.randrange(users - 1) for _ in range(degree)]
+        rows.append(ArrayR.from_list([usernames[j + (j >= i)] for j in picks]))
+    return usernames, ArrayR.from_list(rows)
+
+
+def scan(conn):
+    """ Visit every follow once through the backend's neighbour rows. """
+    total = 0
+    graph = conn._graph
+    for i in range(len(graph)):
+        following = graph.successors(i)
+        for k in range(len(following)):
+            total += following[k]
+    return total
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--users", type=int, default=100_000)
+    p.add_argument("--degree", type=int, default=10)
+    p.add_argument("--seed", type=int, default=1008)
+    args = p.parse_args()
+
+    usernames, rows = random_graph(args.users, args.degree, args.seed)
+    print(f"users={args.users} follows/user={args.degree}")
+    for backend in Connections.BACKENDS:
+        start = time.perf_counter()
+        Connections(usernames, rows, backend=backend)
+        build = time.perf_counter() - start
+
+        # a second, traced build for memory, as tracing slows the build down
+        tracemalloc.start()
+        conn = Connections(usernames, rows, backend=backend)
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        scan(conn)
+        scanned = time.perf_counter() - start
+
+        edges = conn._graph.number_of_edges()
+        print(f"  {backend:5}: build {build:7.2f} s, held {held / 2**20:8.1f} MiB "
+              f"({held / edges:6.1f} B/follow), scan {scanned:6.2f} s")
+        del conn
+
+
+if __name__ == "__main__":
+    main()
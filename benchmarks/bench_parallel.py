@@ -0,0 +1,42 @@
+"""
+Scaling benchmark of the process-pool scan behind the cluster queries: the
+pass over every user that counts one-sided follows and joins mutual friends
+into components, run with 1, 2, 4 and 8 workers. Each run is checked to
+give the same clusters as the serial scan.
+
+    python -m benchmarks.bench_parallel --users 200000 --degree 10
+"""
+import argparse
+import os
+import time
+
+from benchmarks.bench_graph_backends import random_graph
+from connections import Connections
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--users", type=int, default=200_000)
+    p.add_argument("--degree", type=int, default=10)
+    p.add_argument("--seed", type=int, default=1008)
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = p.parse_args()
+
+    usernames, rows = random_graph(args.users, args.degree, args.seed)
+    conn = Connections(usernames, rows, backend="csr")
+    expected = [list(cluster) for cluster in conn.get_ai_clusters_1054()]
+
+    print(f"users={args.users} follows/user={args.degree} cpus={os.cpu_count()}")
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        conn._scan(workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        same = [list(cluster) for cluster in conn.get_ai_clusters_1054(workers=workers)] == expected
+        print(f"  workers={workers}: scan {elapsed * 1e3:9.1f} ms  speed-up {baseline / elapsed:4.2f}x"
+              f"  same clusters: {same}")
+
+
+if __name__ == "__main__":
+    main()
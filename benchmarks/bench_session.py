@@ -0,0 +1,98 @@
+"""
+Benchmark of Session blueness tracking under pinch-heavy workloads.
+
+For every history length it opens that many random TipTops, goes back over
+part of them, then pinches the current TipTop many times, timing pinch_out
+and get_blueness per call. get_blueness should cost the same whatever the
+history length and however often the TipTop changes, and pinch_out should
+depend on the intensity rather than the image size. Every run is checked
+against the median recomputed from scratch.
+
+With --numpy the TipTops are NumPy arrays, which pinch_out brightens with
+whole-array operations instead of the pure-Python row-span kernel.
+
+    python -m benchmarks.bench_session --history 10 100 1000 --pinches 2000 --size 270 480
+    python -m benchmarks.bench_session --numpy --size 1080 1920 --max-intensity 200
+"""
+import argparse
+import random
+import statistics
+import time
+
+from data_structures import ArrayR
+from session import Session
+
+
+def random_tiptop(rng, rows, cols):
+    """ A rows x cols TipTop with random colours, blue capped at 200. """
+    tiptop = ArrayR(rows)
+    for r in range(rows):
+        row = ArrayR(cols)
+        for c in range(cols):
+            row[c] = ArrayR.from_list([rng.randrange(256), rng.randrange(256), rng.randrange(201)])
+        tiptop[r] = row
+    return tiptop
+
+
+def random_array_tiptop(rng, rows, cols):
+    """ random_tiptop as a NumPy array of shape (rows, cols, 3). """
+    import numpy
+    generator = numpy.random.default_rng(rng.randrange(1 << 32))
+    tiptop = generator.integers(0, 256, size=(rows, cols, 3), dtype=numpy.int64)
+    tiptop[:, :, 2] %= 201
+    return tiptop
+
+
+def distinct_blues(tiptop):
+    return len({tiptop[r][c][2] for r in range(len(tiptop)) for c in range(len(tiptop[0]))})
+
+
+def run(history, pinches, rows, cols, max_intensity, seed, use_numpy=False):
+    rng = random.Random(seed)
+    make = random_array_tiptop if use_numpy else random_tiptop
+    tiptops = [make(rng, rows, cols) for _ in range(min(history, 20))]
+    session = Session("bench", tiptops[0], history + 1)
+    for k in range(1, history):
+        session.swipe_up(tiptops[k % len(tiptops)])
+    for _ in range(history // 2):
+        session.swipe_right()
+
+    pinch_time = blueness_time = 0.0
+    for _ in range(pinches):
+        row, col = rng.randrange(rows), rng.randrange(cols)
+        intensity = rng.randrange(1, max_intensity + 1)
+        start = time.perf_counter()
+        session.pinch_out(row, col, intensity)
+        pinch_time += time.perf_counter() - start
+        start = time.perf_counter()
+        session.get_blueness()
+        blueness_time += time.perf_counter() - start
+
+    # every view of a TipTop still in the history follows its edits
+    views = [distinct_blues(tiptops[k % len(tiptops)]) for k in range(history)]
+    correct = session.get_blueness() == statistics.median(views)
+    return pinch_time / pinches, blueness_time / pinches, correct
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--history", type=int, nargs="+", default=[10, 100, 1000])
+    p.add_argument("--pinches", type=int, default=2000)
+    p.add_argument("--size", type=int, nargs=2, default=[270, 480], metavar=("ROWS", "COLS"))
+    p.add_argument("--max-intensity", type=int, default=20)
+    p.add_argument("--seed", type=int, default=1008)
+    p.add_argument("--numpy", action="store_true", help="hold the TipTops as NumPy arrays")
+    args = p.parse_args()
+
+    rows, cols = args.size
+    kind = "NumPy" if args.numpy else "ArrayR"
+    print(f"{kind} TipTops {rows}x{cols}, {args.pinches} pinches of intensity 1..{args.max_intensity}")
+    for history in args.history:
+        pinch, blueness, correct = run(history, args.pinches, rows, cols, args.max_intensity, args.seed,
+                                       args.numpy)
+        print(f"  history={history:<6} pinch_out {pinch * 1e6:9.1f} us  get_blueness {blueness * 1e6:6.3f} us"
+              f"  median correct: {correct}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark of Connections start-up: building from arrays versus opening a
+memory-mapped snapshot written by Connections.write_snapshot.
+
+    python -m benchmarks.bench_snapshot --users 100000 --degree 10
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_graph_backends import random_graph
+from connections import Connections
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--users", type=int, default=100_000)
+    p.add_argument("--degree", type=int, default=10)
+    p.add_argument("--seed", type=int, default=1008)
+    args = p.parse_args()
+
+    usernames, rows = random_graph(args.users, args.degree, args.seed)
+    start = time.perf_counter()
+    conn = Connections(usernames, rows, backend="csr")
+    build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "connections.snapshot")
+        start = time.perf_counter()
+        conn.write_snapshot(path)
+        write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        opened = Connections.open_snapshot(path)
+        open_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        opened.mutual_friends(usernames[0], usernames[1])
+        first_query = time.perf_counter() - start
+
+        print(f"users={args.users} follows/user={args.degree} snapshot={os.path.getsize(path) / 2**20:.1f} MiB")
+        print(f"  build from arrays: {build * 1e3:10.1f} ms")
+        print(f"  write snapshot   : {write * 1e3:10.1f} ms")
+        print(f"  open snapshot    : {open_time * 1e3:10.1f} ms")
+        print(f"  first query      : {first_query * 1e3:10.3f} ms")
+        del opened
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark for looking up a username's index in Connections.
+
+Compares the old linear scan over Connections.usernames with the hashed
+directory that Connections now builds in __init__.
+
+    python -m benchmarks.bench_user_index --users 100000 --lookups 200
+"""
+import argparse
+import random
+import time
+
+from connections import Connections
+from data_structures import ArrayR
+
+
+def linear_index(usernames, username):
+    """ The lookup Connections used before the hashed directory. """
+    for i in range(len(usernames)):
+        if usernames[i] == username:
+            return i
+    return -1
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--users", type=int, default=100_000)
+    p.add_argument("--lookups", type=int, default=200)
+    p.add_argument("--seed", type=int, default=1008)
+    args = p.parse_args()
+
+    rng = random.Random(args.seed)
+    usernames = ArrayR.from_list([f"user{i}" for i in range(args.users)])
+    connections = ArrayR.from_list([ArrayR(0) for _ in range(args.users)])
+    queries = [usernames[rng.randrange(args.users)] for _ in range(args.lookups)]
+
+    start = time.perf_counter()
+    conn = Connections(usernames, connections)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in queries:
+        linear_index(usernames, name)
+    linear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in queries:
+        conn._get_user_index(name)
+    hashed = time.perf_counter() - start
+
+    print(f"users={args.users} lookups={args.lookups}")
+    print(f"  directory build : {build * 1e3:10.2f} ms")
+    print(f"  linear scan     : {linear / args.lookups * 1e6:10.2f} us/lookup")
+    print(f"  hashed directory: {hashed / args.lookups * 1e6:10.2f} us/lookup")
+    print(f"  speedup         : {linear / hashed:10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Seeded synthetic follow graphs for benchmarking Connections.
+
+Every generator takes the number of users, a seed and a mean number of
+follows per user, and returns (usernames, rows) ready for Connections:
+usernames is an ArrayR and rows[i] a tuple of the usernames user i
+follows. The same arguments always give the same graph. Rows are tuples
+rather than ArrayRs so that graphs of a million users fit in memory.
+
+    from benchmarks.generators import GENERATORS
+    usernames, rows = GENERATORS["power-law"](100_000, seed=1008)
+"""
+import random
+from bisect import bisect_left
+from itertools import accumulate
+
+from data_structures import ArrayR
+
+
+def _finish(users, follows):
+    """ (usernames, rows) from per-user sets of followed indices. """
+    names = [f"user{i}" for i in range(users)]
+    rows = ArrayR(max(1, users))
+    for i in range(users):
+        rows[i] = tuple(names[j] for j in sorted(follows[i]))
+    return ArrayR.from_list(names), rows
+
+
+def _follow_back(rng, follows, reciprocity):
+    """ Return each follow with the given probability. """
+    for i in range(len(follows)):
+        for j in tuple(follows[i]):
+            if rng.random() < reciprocity:
+                follows[j].add(i)
+
+
+def sparse_graph(users, seed, degree=2, reciprocity=0.3):
+    """ Uniformly random follows, few per user; most users have no mutual friends. """
+    rng = random.Random(seed)
+    follows = [set() for _ in range(users)]
+    for i in range(users):
+        for _ in range(rng.randint(0, 2 * degree)):
+            j = rng.randrange(users - 1)
+            follows[i].add(j + (j >= i))
+    _follow_back(rng, follows, reciprocity)
+    return _finish(users, follows)
+
+
+def power_law_graph(users, seed, degree=10, exponent=2.1, reciprocity=0.3):
+    """
+    Scale-free graph: out-degrees follow a Pareto law with the given mean, and
+    targets are picked with Zipf popularity, so a few users have huge follower lists.
+    """
+    rng = random.Random(seed)
+    popularity = list(accumulate(1 / (rank + 1) ** (1 / (exponent - 1)) for rank in range(users)))
+    # shuffle who is popular so it does not follow the user order
+    celebrity = list(range(users))
+    rng.shuffle(celebrity)
+    alpha = exponent - 1
+    scale = degree * (alpha - 1) / alpha if alpha > 1 else 1
+    follows = [set() for _ in range(users)]
+    for i in range(users):
+        count = min(users - 1, 100 * degree, int(scale * rng.paretovariate(alpha)))
+        for _ in range(count):
+            j = celebrity[bisect_left(popularity, rng.random() * popularity[-1])]
+            if j != i:
+                follows[i].add(j)
+    _follow_back(rng, follows, reciprocity)
+    return _finish(users, follows)
+
+
+def bot_farm_graph(users, seed, degree=4, farm_share=0.5, farm_size=(3, 12)):
+    """
+    A share of the users sit in bot farms: groups where everyone follows
+    everyone and nobody else. The rest follow each other at random, never
+    into a farm, so every farm is a bot cluster for both courses.
+    """
+    rng = random.Random(seed)
+    follows = [set() for _ in range(users)]
+    order = list(range(users))
+    rng.shuffle(order)
+    farmed = int(users * farm_share)
+    start = 0
+    while start < farmed:
+        farm = order[start:min(farmed, start + rng.randint(*farm_size))]
+        for i in farm:
+            follows[i].update(j for j in farm if j != i)
+        start += len(farm)
+    humans = order[farmed:]
+    for i in humans:
+        for _ in range(rng.randint(0, 2 * degree)):
+            j = humans[rng.randrange(len(humans))]
+            if j != i:
+                follows[i].add(j)
+    _follow_back(rng, follows, 0.3)
+    return _finish(users, follows)
+
+
+def clique_rich_graph(users, seed, degree=6, noise=0.05):
+    """
+    Users grouped into mutual cliques of about degree + 1 members, with a few
+    one-sided follows across cliques (noise per user) that break some of them.
+    """
+    rng = random.Random(seed)
+    follows = [set() for _ in range(users)]
+    order = list(range(users))
+    rng.shuffle(order)
+    start = 0
+    while start < users:
+        clique = order[start:start + rng.randint(max(2, degree // 2), 2 * degree + 1)]
+        for i in clique:
+            follows[i].update(j for j in clique if j != i)
+        start += len(clique)
+    for i in range(users):
+        if rng.random() < noise:
+            j = rng.randrange(users - 1)
+            follows[i].add(j + (j >= i))
+    return _finish(users, follows)
+
+
+GENERATORS = {
+    "power-law": power_law_graph,
+    "bot-farm": bot_farm_graph,
+    "clique-rich": clique_rich_graph,
+    "sparse": sparse_graph,
+}
@@ -1,258 +1,2007 @@
-from data_structures import ArrayStack
+import mmap
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from data_structures.adjacency_list_graph import AdjacencyListGraph
+from data_structures.array_min_heap import ArrayMinHeap
+from data_structures.csr_graph import CSRGraph
+from data_structures.disjoint_set import DisjointSet
+from data_structures.hash_table import LinearProbeTable
 from data_structures.linked_list import LinkedList
+from data_structures.min_hash import MinHashIndex
 from data_structures.referential_array import ArrayR
+from data_structures.string_table import StringTable
+from data_structures.varint_graph import VarintGraph
+
+
+def _filled(typecode: str, n: int, value: int) -> array:
+    """ Typed array of n copies of value; per-user numbers are kept in these
+    rather than ArrayR, which costs a Python object per entry. """
+    return array(typecode, (value,)) * n
+
+
+def _lines(f, chunk_size: int):
+    """ Yields (line number, line) for the lines of a binary file read chunk_size
+    bytes at a time, without their line ending; only the current chunk and the
+    line spanning it are held in memory. """
+    number = 0
+    pending = b""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        chunk = pending + chunk
+        start = 0
+        end = chunk.find(b"\n")
+        while end >= 0:
+            number += 1
+            yield number, chunk[start:end]
+            start = end + 1
+            end = chunk.find(b"\n", start)
+        pending = chunk[start:]
+    if pending:
+        yield number + 1, pending
+
+
+# Snapshot file layout: a header, then SNAPSHOT_SECTIONS in this order, each
+# starting on an 8-byte boundary. The header is the magic, the byte order of
+# the arrays ('l' or 'b'), the number of sections, the number of user slots and
+# of live users, and an (offset, size in bytes) pair per section.
+SNAPSHOT_MAGIC = b"TIPTOPC1"
+SNAPSHOT_SECTIONS = (
+    ("name_offsets", 'q'), ("name_blob", 'B'), ("name_present", 'b'), ("name_directory", 'i'),
+    ("out_offsets", 'q'), ("out_targets", 'i'), ("in_offsets", 'q'), ("in_sources", 'i'),
+    ("unreciprocated_out", 'i'), ("unreciprocated_in", 'i'), ("is_bot", 'b'), ("bots", 'i'),
+    ("cluster_leader", 'i'), ("cluster_leaders", 'i'),
+)
+_SNAPSHOT_HEADER = struct.Struct(f"<8sIIqq{2 * len(SNAPSHOT_SECTIONS)}q")
+
+
+def _scan_users(graph, lo: int, hi: int, components: DisjointSet, forest: array = None):
+    """ Scans users lo..hi-1 of graph. Returns their numbers of one-sided follows
+    out and in and of mutual friends, as typed arrays indexed from lo. Mutual
+    edges are unioned in components; the ones that joined two components are
+    also appended to forest as pairs, when it is given.
+    :complexity: O((hi - lo) + E(lo..hi)) expected, plus O(V) for the scratch marks
+    """
+    n = len(graph)
+    unreciprocated_out = _filled('i', hi - lo, 0)
+    unreciprocated_in = _filled('i', hi - lo, 0)
+    mutual_degree = _filled('i', hi - lo, 0)
+    follows_stamp = _filled('i', n, -1)
+    followed_by_stamp = _filled('i', n, -1)
+
+    # User i stamps who they follow and who follows them, so every
+    # reciprocity check is an O(1) array read
+    for i in range(lo, hi):
+        following = graph.successors(i)
+        followers = graph.predecessors(i)
+        for k in range(len(following)):
+            follows_stamp[following[k]] = i
+        for k in range(len(followers)):
+            followed_by_stamp[followers[k]] = i
+
+        missing_out = 0
+        degree = 0
+        for k in range(len(following)):
+            j = following[k]
+            if followed_by_stamp[j] != i:
+                missing_out += 1
+                continue
+            degree += 1
+            # each mutual edge is unioned from its lower end only
+            if j > i and components.union(i, j) and forest is not None:
+                forest.append(i)
+                forest.append(j)
+        missing_in = 0
+        for k in range(len(followers)):
+            if follows_stamp[followers[k]] != i:
+                missing_in += 1
+        unreciprocated_out[i - lo] = missing_out
+        unreciprocated_in[i - lo] = missing_in
+        mutual_degree[i - lo] = degree
+    return unreciprocated_out, unreciprocated_in, mutual_degree
+
+
+# Follow graph of a pool process, set once by _init_scan_worker
+_worker_graph = None
+
+
+def _init_scan_worker(source) -> None:
+    """ Pool initializer: source is a snapshot path or the four CSR buffers as bytes. """
+    global _worker_graph
+    if isinstance(source, str):
+        _worker_graph = Connections.open_snapshot(source)._graph
+    else:
+        _worker_graph = CSRGraph(memoryview(source[0]).cast(CSRGraph.OFFSET_TYPECODE),
+                                 memoryview(source[1]).cast(CSRGraph.VERTEX_TYPECODE),
+                                 memoryview(source[2]).cast(CSRGraph.OFFSET_TYPECODE),
+                                 memoryview(source[3]).cast(CSRGraph.VERTEX_TYPECODE))
+
+
+def _scan_partition(lo: int, hi: int) -> tuple:
+    """ Pool task: _scan_users over lo..hi-1 of the worker's graph, with a local
+    union-find whose spanning forest is returned for the merge. """
+    forest = array('i')
+    counts = _scan_users(_worker_graph, lo, hi, DisjointSet(len(_worker_graph)), forest)
+    return (lo, hi) + counts + (forest,)
+
 
 class Connections:
     """
     Handles user connections and friendships in the TipTop platform.
+
+    Users are identified internally by their index in usernames. The follow
+    graph can be edited with add_user, follow, unfollow and remove_user; bot
+    status and FIT1054 cluster membership are kept up to date by each edit,
+    so the cluster queries never recompute from scratch.
+
+    Removed users leave an empty (None) slot in usernames so that the
+    indices of everyone else stay valid.
+
+    The follow graph is stored by one of three backends:
+    - "lists": sorted neighbour lists per user, cheap to edit (the default)
+    - "csr": compressed sparse rows of 32-bit indices, about 8 bytes per
+      follow, for large read-mostly graphs; the first edit converts it to "lists"
+    - "varint": "csr" with every row delta-varint encoded, about 2 to 3 bytes
+      per follow, at the price of decoding rows on every read (see VarintGraph)
     """
-    
-    def __init__(self, usernames, connections):
+
+    BACKENDS = ("lists", "csr", "varint")
+
+    # Breadth-first searches expand a level bottom-up once the edges out of the
+    # frontier exceed 1/BOTTOM_UP_FACTOR of the edges into unvisited users
+    BOTTOM_UP_FACTOR = 14
+
+    def __init__(self, usernames, connections, bitset_adjacency: bool = False, backend: str = "lists",
+                 workers: int = 1):
         """
         Initialize the Connections system.
-        
+
         Args:
             usernames: Array containing usernames of all users
             connections: 2D array where connections[i] contains friends of usernames[i]
+            bitset_adjacency: If True, also store every user's follow set and
+                follower set as big-int bitmaps over user indices, so follow
+                checks and set algebra on them are single bit operations.
+                Costs O(V^2 / 8) bytes in the worst (dense) case.
+            backend: How the follow graph is stored, one of Connections.BACKENDS
+            workers: Number of processes sharing the scan for bots and clusters (see _scan)
+
+        Raises:
+            ValueError: if the backend is unknown
+
+        Time complexity: O(V + E log d) expected, d being the largest number of connections;
+        O(V + E) expected with the "csr" and "varint" backends
         """
-        # Store the number of users
+        if backend not in Connections.BACKENDS:
+            raise ValueError(f"Unknown backend {backend}, expected one of {Connections.BACKENDS}.")
+
+        # Store the number of users; slots also count removed users
         self.num_users = len(usernames)
-        
-        # Store usernames and connections arrays directly
+        self._n_slots = self.num_users
+
+        # Store the usernames array directly; it is only copied when it has to grow
         self.usernames = usernames
-        self.connections = connections
-    
+
+        # Memory map behind an instance opened with open_snapshot, and its path
+        self._snapshot = None
+        self._snapshot_path = None
+
+        # Directory from username to its index, so lookups do not scan usernames
+        self._index = LinearProbeTable(self.num_users)
+        for i in range(self.num_users):
+            self._index[usernames[i]] = i
+
+        # Integer follow graph holding both directions, stored by the chosen backend
+        self._build_adjacency(connections, backend)
+        self._build_state(bitset_adjacency, workers)
+
+    def _build_state(self, bitset_adjacency: bool, workers: int) -> None:
+        """
+        Derive the bot, cluster and cache state from the follow graph, once
+        usernames, _index and _graph are set.
+
+        Time complexity: O(V + E) expected, plus O(V^2 / 8) for bitset_adjacency
+        """
+        # Per-user counts of one-sided follows, from which bot status is read in O(1),
+        # and the components joined by mutual follows
+        unreciprocated_out, unreciprocated_in, mutual_degree, components = self._scan(workers)
+        self._unreciprocated_out = unreciprocated_out
+        self._unreciprocated_in = unreciprocated_in
+
+        # Bots, and the FIT1054 cluster every user belongs to (-1 for none),
+        # identified by the cluster's first user index (its leader). The flags
+        # are the state edits maintain; the ascending bot and leader indices
+        # found here serve the queries until the first edit (see _bot_indices)
+        self._is_bot_flag = _filled('b', self._n_slots, False)
+        self._bot_order = array('i')
+        for i in range(self._n_slots):
+            if self._is_bot_index(i):
+                self._is_bot_flag[i] = True
+                self._bot_order.append(i)
+        self._cluster_leader, self._leader_order = self._label_clusters_1054(
+            components, mutual_degree, unreciprocated_out)
+
+        # Scratch marks for cluster queries; a fresh stamp value clears them
+        self._included = _filled('q', self._n_slots, 0)
+        self._stamp = 0
+
+        # Results of whole-graph queries, valid for the graph version they were
+        # computed at; every edit bumps the version and clears them
+        self._version = 0
+        self._cache = LinearProbeTable()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Optional bitmap adjacency: bit j of _follow_bits[i] is set when user i
+        # follows user j, bit i of _follower_bits[j] is set for the same edge.
+        self._follow_bits = None
+        self._follower_bits = None
+        if bitset_adjacency:
+            self._build_bitsets()
+
+    def _build_adjacency(self, connections, backend: str) -> None:
+        """
+        Convert the username friend lists into index rows and build the
+        follow graph, which also holds the reverse (followers) direction.
+
+        Time complexity: O(V + E log d) expected for "lists", O(V + E) expected otherwise
+        """
+        n = self.num_users
+        rows = ArrayR(n)
+        for i in range(n):
+            friends = connections[i]
+            row = _filled('i', len(friends), 0)
+            for k in range(len(friends)):
+                friend_index = self._get_user_index(friends[k])
+                if friend_index < 0:
+                    raise ValueError(f"{self.usernames[i]} follows unknown user {friends[k]}.")
+                if friend_index == i:
+                    raise ValueError("Users cannot follow themselves.")
+                row[k] = friend_index
+            rows[i] = row
+        if backend == "csr":
+            self._graph = CSRGraph.from_successor_rows(rows)
+        elif backend == "varint":
+            self._graph = VarintGraph.from_graph(CSRGraph.from_successor_rows(rows))
+        else:
+            self._graph = AdjacencyListGraph.from_successor_rows(rows)
+
+    @classmethod
+    def from_edge_list(cls, source, backend: str = "csr", separator: str = "\t", chunk_size: int = 1 << 20,
+                       bitset_adjacency: bool = False, workers: int = 1):
+        """
+        Build the system from an edge list with one follow per line,
+        follower<separator>followee, without materialising usernames and
+        connections first.
+
+        The file is streamed in chunks of chunk_size bytes. Usernames are
+        interned as they first appear, which also gives their order in
+        usernames, and every follow is kept as a pair of 32-bit indices until
+        the CSR graph is built from them (see CSRGraph.from_edges), so memory
+        peaks at about 1.5 times the final graph instead of holding nested
+        username arrays besides it. Blank lines and lines starting with # are
+        skipped, repeated follows are stored once and a user appearing only
+        on one side of a line is still a user.
+
+        Args:
+            source: Path of a UTF-8 edge file, or a file object opened in binary
+                mode (from open(path, "rb"), gzip.open, a socket, ...)
+            backend: How the follow graph is stored, "csr" by default
+            separator: Text between the follower and the followee on a line
+            chunk_size: Number of bytes read at a time
+            bitset_adjacency: As for the constructor
+            workers: As for the constructor
+
+        Raises:
+            ValueError: if the backend is unknown, a line has no separator or an
+                empty username, or a user follows themselves
+
+        Time complexity: O(V + E) expected, E counting repeated follows
+        """
+        if backend not in Connections.BACKENDS:
+            raise ValueError(f"Unknown backend {backend}, expected one of {Connections.BACKENDS}.")
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                return cls.from_edge_list(f, backend, separator, chunk_size, bitset_adjacency, workers)
+
+        conn = cls.__new__(cls)
+        conn._snapshot = None
+        conn._snapshot_path = None
+        conn._index = LinearProbeTable()
+        conn.usernames = ArrayR(1024)
+        conn._n_slots = 0
+        conn._follow_bits = None
+
+        def intern(name: bytes) -> int:
+            username = name.decode()
+            index = conn._index.get(username)
+            if index is None:
+                if conn._n_slots == len(conn.usernames):
+                    conn._grow()
+                index = conn._n_slots
+                conn.usernames[index] = username
+                conn._index[username] = index
+                conn._n_slots += 1
+            return index
+
+        sep = separator.encode()
+        sources = array('i')
+        targets = array('i')
+        for number, line in _lines(source, chunk_size):
+            line = line.strip()
+            if not line or line.startswith(b"#"):
+                continue
+            split = line.find(sep)
+            follower = line[:split].strip()
+            followee = line[split + len(sep):].strip()
+            if split < 0 or not follower or not followee:
+                raise ValueError(f"Line {number} is not follower{separator!r}followee.")
+            if follower == followee:
+                raise ValueError("Users cannot follow themselves.")
+            sources.append(intern(follower))
+            targets.append(intern(followee))
+
+        n = conn._n_slots
+        conn.num_users = n
+        conn.usernames = conn._resized(conn.usernames, n)
+        conn._graph = CSRGraph.from_edges(n, sources, targets, consume=True)
+        del sources, targets
+        if backend == "lists":
+            conn._thaw()
+        elif backend == "varint":
+            conn._graph = VarintGraph.from_graph(conn._graph)
+        conn._build_state(bitset_adjacency, workers)
+        return conn
+
+    def _thaw(self) -> None:
+        """
+        Switch a read-only graph backend to editable sorted lists before an edit,
+        copying any state still read from a snapshot into memory first.
+
+        Time complexity: O(V + E log d) the first time, O(1) afterwards
+        """
+        if self._snapshot is not None:
+            self._load_snapshot_state()
+        if isinstance(self._graph, AdjacencyListGraph):
+            return
+        rows = ArrayR(len(self._graph))
+        for i in range(len(self._graph)):
+            rows[i] = self._graph.successors(i)
+        self._graph = AdjacencyListGraph.from_successor_rows(rows)
+
+    def write_snapshot(self, path: str) -> None:
+        """
+        Write the whole system to a binary snapshot file for open_snapshot:
+        the usernames with their hashed directory, the follow graph in CSR form
+        in both directions, and the precomputed bot and FIT1054 cluster state.
+
+        Time complexity: O(V + E + total length of the usernames)
+        """
+        n = self._n_slots
+        names = StringTable.build(self.usernames, n)
+        graph = self._csr_graph()
+        bots = self._bot_indices()
+        leaders = self._leader_indices()
+
+        buffers = names.buffers() + graph.buffers() + (
+            self._unreciprocated_out, self._unreciprocated_in, self._is_bot_flag, bots,
+            self._cluster_leader, leaders,
+        )
+        layout = _filled('q', 2 * len(SNAPSHOT_SECTIONS), 0)
+        position = _SNAPSHOT_HEADER.size
+        for k in range(len(buffers)):
+            position += -position % 8
+            layout[2 * k] = position
+            layout[2 * k + 1] = memoryview(buffers[k]).nbytes
+            position += layout[2 * k + 1]
+
+        with open(path, "wb") as f:
+            f.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, ord(sys.byteorder[0]),
+                                          len(SNAPSHOT_SECTIONS), n, self.num_users, *layout))
+            for k in range(len(buffers)):
+                f.write(bytes(layout[2 * k] - f.tell()))
+                f.write(buffers[k])
+
+    @classmethod
+    def open_snapshot(cls, path: str):
+        """
+        Open a snapshot written by write_snapshot without loading it.
+
+        The file is memory-mapped read-only and every array is a zero-copy view
+        of it, so opening costs O(V) bytes of scratch space but no per-user work,
+        and processes opening the same file share its pages. The first edit
+        copies the state into memory (see _thaw).
+
+        Raises:
+            ValueError: if the file is not a snapshot for this machine's byte order
+
+        Time complexity: O(1) Python steps besides allocating the O(V) scratch marks
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < _SNAPSHOT_HEADER.size:
+            raise ValueError(f"{path} is not a Connections snapshot.")
+        header = _SNAPSHOT_HEADER.unpack_from(mapped)
+        if header[0] != SNAPSHOT_MAGIC or header[2] != len(SNAPSHOT_SECTIONS):
+            raise ValueError(f"{path} is not a Connections snapshot.")
+        if header[1] != ord(sys.byteorder[0]):
+            raise ValueError(f"{path} was written with a different byte order.")
+
+        view = memoryview(mapped)
+        sections = ArrayR(len(SNAPSHOT_SECTIONS))
+        for k in range(len(SNAPSHOT_SECTIONS)):
+            start = header[5 + 2 * k]
+            section = view[start:start + header[6 + 2 * k]]
+            sections[k] = section.cast(SNAPSHOT_SECTIONS[k][1])
+
+        conn = cls.__new__(cls)
+        conn._snapshot = mapped
+        conn._snapshot_path = path
+        conn.num_users = header[4]
+        conn._n_slots = header[3]
+        names = StringTable(sections[0], sections[1], sections[2], sections[3])
+        conn.usernames = names
+        conn._index = names
+        conn._graph = CSRGraph(sections[4], sections[5], sections[6], sections[7])
+        conn._unreciprocated_out = sections[8]
+        conn._unreciprocated_in = sections[9]
+        conn._is_bot_flag = sections[10]
+        conn._bot_order = sections[11]
+        conn._cluster_leader = sections[12]
+        conn._leader_order = sections[13]
+        conn._included = _filled('q', conn._n_slots, 0)
+        conn._stamp = 0
+        conn._version = 0
+        conn._cache = LinearProbeTable()
+        conn.cache_hits = 0
+        conn.cache_misses = 0
+        conn._follow_bits = None
+        conn._follower_bits = None
+        return conn
+
+    def _load_snapshot_state(self) -> None:
+        """
+        Copy the usernames and per-user state of a snapshot-backed instance into
+        editable in-memory structures. The graph stays on the mapping until _thaw
+        converts it.
+
+        Time complexity: O(V + total length of the usernames)
+        """
+        n = self._n_slots
+        usernames = ArrayR(max(1, n))
+        self._index = LinearProbeTable(n)
+        for i in range(n):
+            usernames[i] = self.usernames[i]
+            if usernames[i] is not None:
+                self._index[usernames[i]] = i
+        self.usernames = usernames
+        self._unreciprocated_out = array('i', self._unreciprocated_out)
+        self._unreciprocated_in = array('i', self._unreciprocated_in)
+        self._is_bot_flag = array('b', self._is_bot_flag)
+        self._cluster_leader = array('i', self._cluster_leader)
+        # an edit follows, after which they are gathered from the flags again
+        self._bot_order = None
+        self._leader_order = None
+        # the mapping is released once the graph views on it are dropped as well
+        self._snapshot = None
+        self._snapshot_path = None
+
+    def _csr_graph(self) -> CSRGraph:
+        """
+        The follow graph in CSR form, converted if it is stored otherwise.
+
+        Time complexity: O(1) for the "csr" backend, otherwise O(V + E)
+        """
+        if isinstance(self._graph, CSRGraph):
+            return self._graph
+        rows = ArrayR(self._n_slots)
+        for i in range(self._n_slots):
+            rows[i] = self._graph.successors(i)
+        return CSRGraph.from_successor_rows(rows)
+
+    def _scan(self, workers: int = 1):
+        """
+        One pass over the whole graph: every user's one-sided follows out and in,
+        their number of mutual friends, and the components joined by mutual follows.
+
+        With more than one worker the users are cut into ranges of about equal
+        numbers of connections, one per process of a concurrent.futures process
+        pool. Each process scans its range with _scan_users, keeping only the
+        mutual edges that joined two of its components (a spanning forest). The
+        ranges come back in order and their forests are unioned here, which gives
+        the same components, and so the same clusters, as a serial scan.
+
+        The processes receive the snapshot path if there is one, otherwise a copy
+        of the graph in CSR form.
+
+        Returns:
+            (unreciprocated_out, unreciprocated_in, mutual_degree, components)
+
+        Raises:
+            ValueError: if workers is less than 1
+
+        Time complexity: O(V + E) expected work, plus O(V) per worker
+        """
+        if workers < 1:
+            raise ValueError("Need at least one worker.")
+        n = self._n_slots
+        components = DisjointSet(n)
+        if workers == 1 or n == 0:
+            unreciprocated_out, unreciprocated_in, mutual_degree = _scan_users(self._graph, 0, n, components)
+            return unreciprocated_out, unreciprocated_in, mutual_degree, components
+
+        if self._snapshot is not None:
+            source = self._snapshot_path
+        else:
+            buffers = self._csr_graph().buffers()
+            source = (bytes(buffers[0]), bytes(buffers[1]), bytes(buffers[2]), bytes(buffers[3]))
+        bounds = self._partition_bounds(workers)
+
+        unreciprocated_out = _filled('i', n, 0)
+        unreciprocated_in = _filled('i', n, 0)
+        mutual_degree = _filled('i', n, 0)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_scan_worker,
+                                 initargs=(source,)) as pool:
+            for lo, hi, part_out, part_in, part_degree, forest in pool.map(
+                    _scan_partition, bounds[:-1], bounds[1:]):
+                unreciprocated_out[lo:hi] = part_out
+                unreciprocated_in[lo:hi] = part_in
+                mutual_degree[lo:hi] = part_degree
+                for k in range(0, len(forest), 2):
+                    components.union(forest[k], forest[k + 1])
+        return unreciprocated_out, unreciprocated_in, mutual_degree, components
+
+    def _partition_bounds(self, parts: int) -> array:
+        """
+        Cut the users into at most parts consecutive ranges carrying about the
+        same number of connections (counting each user once as well).
+
+        Returns:
+            parts + 1 boundaries; range p is bounds[p] to bounds[p + 1]
+
+        Time complexity: O(V)
+        """
+        n = self._n_slots
+        total = 2 * self._graph.number_of_edges() + n
+        bounds = _filled('q', parts + 1, n)
+        bounds[0] = 0
+        done = 0
+        p = 1
+        for i in range(n):
+            if p < parts and done * parts >= p * total:
+                bounds[p] = i
+                p += 1
+            done += self._graph.out_degree(i) + self._graph.in_degree(i) + 1
+        return bounds
+
+    def _build_bitsets(self) -> None:
+        """
+        Build the follow and follower bitmaps for every user.
+
+        Time complexity: O(V + E) bit operations, each costing O(V / w) on
+        Python's big integers (w = machine word size).
+        """
+        self._follow_bits = ArrayR(len(self.usernames))
+        self._follower_bits = ArrayR(len(self.usernames))
+        for i in range(len(self.usernames)):
+            self._follow_bits[i] = 0
+            self._follower_bits[i] = 0
+        for i in range(self._n_slots):
+            bits = 0
+            user_bit = 1 << i
+            following = self._graph.successors(i)
+            for k in range(len(following)):
+                friend_index = following[k]
+                bits |= 1 << friend_index
+                self._follower_bits[friend_index] |= user_bit
+            self._follow_bits[i] = bits
+
     def _get_user_index(self, username: str) -> int:
         """
         Helper method to find the index of a username.
-        Linear search through usernames array.
-        
+        Looks the username up in the hashed directory built in __init__.
+
         Args:
             username: Username to find
-            
+
         Returns:
-            Index of the username in the usernames array
+            Index of the username in the usernames array, or -1 if unknown
+
+        Time complexity: O(1) expected
         """
-        for i in range(len(self.usernames)):
-            if self.usernames[i] == username:
-                return i
-        return -1  # Should not happen based on assumptions
-    
+        return self._index.get(username, -1)
+
+    def _require_user_index(self, username: str) -> int:
+        """
+        Index of a username that must exist.
+
+        Raises:
+            ValueError: if the username is unknown
+        """
+        index = self._get_user_index(username)
+        if index < 0:
+            raise ValueError(f"Unknown user {username}.")
+        return index
+
     def mutual_friends(self, username1: str, username2: str) -> bool:
         """
         Check if two users are mutual friends.
-        
+
         Args:
             username1: First user's username
             username2: Second user's username
-            
+
         Returns:
             True if they are mutual friends, False otherwise
+
+        Raises:
+            ValueError: if either user is unknown
         """
         # Get indices of both users
-        index1 = self._get_user_index(username1)
-        index2 = self._get_user_index(username2)
-        
-        # Check if username1 is in username2's friends list
-        user1_follows_user2 = False
-        for friend in self.connections[index1]:
-            if friend == username2:
-                user1_follows_user2 = True
-                break
-        
-        # Check if username2 is in username1's friends list  
-        user2_follows_user1 = False
-        for friend in self.connections[index2]:
-            if friend == username1:
-                user2_follows_user1 = True
-                break
-                
+        index1 = self._require_user_index(username1)
+        index2 = self._require_user_index(username2)
+
         # They are mutual friends only if both follow each other
-        return user1_follows_user2 and user2_follows_user1
-    
-    def get_ai_clusters_1008_2085(self):
+        return self._follows(index1, index2) and self._follows(index2, index1)
+
+    def mutual_friends_many(self, pairs) -> array:
+        """
+        mutual_friends for a batch of pairs.
+
+        Pairs are grouped by their first user in a hash table, and each first
+        user's mutual friends are listed once and looked up in a small table of
+        the second users asked about with them (or bit tested in bitset mode).
+        No per-user scratch array is touched, so the cost does not depend on
+        the number of users, and the batch can run while a cluster generator
+        is being consumed.
+
+        Args:
+            pairs: Iterable of (username1, username2) pairs
+
+        Returns:
+            array of signed chars, 1 where the pair are mutual friends and 0
+            otherwise, in the order of pairs
+
+        Raises:
+            ValueError: if a username is unknown
+
+        Time complexity: O(P + D) expected for P pairs, where D is the total number of
+        connections of the distinct first users
+        """
+        # Resolve the names, reusing the previous pair's index when a name repeats
+        # (report logs list the pairs of one user together)
+        firsts = array('i')
+        seconds = array('i')
+        lookup = self._index.get
+        name1 = name2 = None
+        index1 = index2 = -1
+        for username1, username2 in pairs:
+            if username1 != name1:
+                name1 = username1
+                index1 = lookup(username1, -1)
+                if index1 < 0:
+                    raise ValueError(f"Unknown user {username1}.")
+            if username2 != name2:
+                name2 = username2
+                index2 = lookup(username2, -1)
+                if index2 < 0:
+                    raise ValueError(f"Unknown user {username2}.")
+            firsts.append(index1)
+            seconds.append(index2)
+        count = len(firsts)
+        answers = _filled('b', count, False)
+
+        # Positions of the pairs of every first user, in input order
+        runs = LinearProbeTable(count)
+        for p in range(count):
+            run = runs.get(firsts[p])
+            if run is None:
+                run = array('i')
+                runs[firsts[p]] = run
+            run.append(p)
+
+        for user, run in runs.items():
+            if self._follow_bits is not None:
+                mutual = self._mutual_bits(user)
+                for p in run:
+                    answers[p] = (mutual >> seconds[p]) & 1
+            else:
+                # Which of the second users asked about are mutual friends
+                is_mutual = LinearProbeTable(len(run))
+                for p in run:
+                    is_mutual[seconds[p]] = False
+                friends = self._mutual_row(user)
+                for f in range(len(friends)):
+                    if friends[f] in is_mutual:
+                        is_mutual[friends[f]] = True
+                for p in run:
+                    answers[p] = is_mutual[seconds[p]]
+        return answers
+
+    def _follows(self, index1: int, index2: int) -> bool:
+        """
+        Check if the user at index1 follows the user at index2.
+
+        Time complexity: O(1) bit test in bitset mode, otherwise O(log d) where
+        d is the number of connections of the user at index1.
+        """
+        if self._follow_bits is not None:
+            return (self._follow_bits[index1] >> index2) & 1 == 1
+        return self._graph.has_edge(index1, index2)
+
+    def _is_followed_by(self, index1: int, index2: int) -> bool:
+        """
+        Check if the user at index1 is followed by the user at index2.
+
+        Time complexity: O(1) bit test in bitset mode, otherwise see _follows.
+        """
+        if self._follower_bits is not None:
+            return (self._follower_bits[index1] >> index2) & 1 == 1
+        return self._follows(index2, index1)
+
+    def _mutual_bits(self, index: int) -> int:
+        """
+        Bitmap of the mutual friends of the user at index (bitset mode only).
+
+        Time complexity: O(V / w), one big-int AND.
+        """
+        return self._follow_bits[index] & self._follower_bits[index]
+
+    def _mutual_row(self, index: int) -> array:
+        """
+        The mutual friends of the user at index in ascending order, by merging
+        their sorted follow and follower rows (see Graph.mutual).
+
+        Time complexity: O(d) where d is the number of connections of the user
+        """
+        return self._graph.mutual(index)
+
+    def _mutual_rows(self):
+        """
+        The mutual friends of every user as compressed rows: those of user i are
+        targets[offsets[i]:offsets[i + 1]], in ascending order. Cached until the
+        graph changes.
+
+        Returns:
+            (offsets, targets): an int64 array and an int32 memoryview
+
+        Time complexity: O(1) expected if the graph is unchanged, otherwise O(V + E)
+        """
+        return self._cached("mutual_rows", self._build_mutual_rows)
+
+    def _build_mutual_rows(self):
+        """ Uncached _mutual_rows(). """
+        offsets = _filled('q', self._n_slots + 1, 0)
+        targets = array('i')
+        for i in range(self._n_slots):
+            targets.extend(self._mutual_row(i))
+            offsets[i + 1] = len(targets)
+        return offsets, memoryview(targets)
+
+    def core_numbers(self) -> array:
+        """
+        The core number of every user in the graph of mutual friendships: the
+        largest k such that the user belongs to a group where everyone has at
+        least k mutual friends inside the group. Dense bot farms stand out with
+        high core numbers even when a few stray follows stop them being bots.
+
+        Computed by bucket peeling (Batagelj and Zaversnik): users are kept in an
+        array sorted by remaining degree, with the start of every degree bucket,
+        and repeatedly the user of least degree is removed, each of their
+        neighbours moving down one bucket with a single swap.
+
+        Returns:
+            int32 array aligned with usernames (0 for removed users). Cached until
+            the graph changes, so it must not be modified.
+
+        Time complexity: O(1) expected if the graph is unchanged since the last call,
+        otherwise O(V + E)
+        """
+        return self._cached("core_numbers", self._peel_cores)
+
+    def _peel_cores(self) -> array:
+        """ Uncached core_numbers(). """
+        n = self._n_slots
+        offsets, targets = self._mutual_rows()
+        degree = _filled('i', n, 0)
+        max_degree = 0
+        for i in range(n):
+            degree[i] = offsets[i + 1] - offsets[i]
+            if degree[i] > max_degree:
+                max_degree = degree[i]
+
+        # Counting sort of the users by degree: order holds them, position
+        # their place in order, and bucket_start the first place of every degree
+        bucket_start = _filled('q', max_degree + 2, 0)
+        for i in range(n):
+            bucket_start[degree[i] + 1] += 1
+        for d in range(max_degree + 1):
+            bucket_start[d + 1] += bucket_start[d]
+        order = _filled('i', n, 0)
+        position = _filled('q', n, 0)
+        cursor = array('q', bucket_start)
+        for i in range(n):
+            position[i] = cursor[degree[i]]
+            order[position[i]] = i
+            cursor[degree[i]] += 1
+
+        # Peel in order; degree[v] is final (v's core number) when v is reached
+        for p in range(n):
+            v = order[p]
+            for k in range(offsets[v], offsets[v + 1]):
+                u = targets[k]
+                if degree[u] > degree[v]:
+                    # swap u with the first user of its bucket, then shrink the bucket
+                    d = degree[u]
+                    first = bucket_start[d]
+                    w = order[first]
+                    if w != u:
+                        order[position[u]] = w
+                        position[w] = position[u]
+                        order[first] = u
+                        position[u] = first
+                    bucket_start[d] += 1
+                    degree[u] -= 1
+        return degree
+
+    def triangle_counts(self) -> array:
+        """
+        The number of triangles of mutual friendships every user is part of.
+
+        Every mutual friendship is oriented from the user of lower degree to the
+        one of higher degree (ties by index), which leaves every user at most
+        O(sqrt(E)) outgoing friendships. Each triangle is then found exactly once,
+        from its lowest-ranked user u: for each friend v of u, the sorted
+        outgoing rows of u and v are merged and every common user closes one.
+
+        Returns:
+            int64 array aligned with usernames. Cached until the graph changes, so
+            it must not be modified.
+
+        Time complexity: O(1) expected if the graph is unchanged since the last call,
+        otherwise O(V + E^1.5)
+        """
+        return self._cached("triangle_counts", self._count_triangles)
+
+    def _count_triangles(self) -> array:
+        """ Uncached triangle_counts(). """
+        n = self._n_slots
+        offsets, targets = self._mutual_rows()
+
+        # Oriented rows: the friends of higher rank, in ascending index order
+        out_offsets = _filled('q', n + 1, 0)
+        out_targets = array('i')
+        for u in range(n):
+            degree_u = offsets[u + 1] - offsets[u]
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                degree_v = offsets[v + 1] - offsets[v]
+                if degree_u < degree_v or (degree_u == degree_v and u < v):
+                    out_targets.append(v)
+            out_offsets[u + 1] = len(out_targets)
+
+        triangles = _filled('q', n, 0)
+        for u in range(n):
+            u_start = out_offsets[u]
+            u_end = out_offsets[u + 1]
+            for k in range(u_start, u_end):
+                v = out_targets[k]
+                a = u_start
+                b = out_offsets[v]
+                b_end = out_offsets[v + 1]
+                while a < u_end and b < b_end:
+                    if out_targets[a] < out_targets[b]:
+                        a += 1
+                    elif out_targets[a] > out_targets[b]:
+                        b += 1
+                    else:
+                        w = out_targets[a]
+                        triangles[u] += 1
+                        triangles[v] += 1
+                        triangles[w] += 1
+                        a += 1
+                        b += 1
+        return triangles
+
+    def clustering_coefficients(self) -> array:
+        """
+        The local clustering coefficient of every user in the graph of mutual
+        friendships: the share of pairs of their mutual friends who are mutual
+        friends themselves (0.0 with fewer than two mutual friends).
+
+        Returns:
+            array of doubles aligned with usernames
+
+        Time complexity: O(V) plus triangle_counts
+        """
+        offsets, _ = self._mutual_rows()
+        triangles = self.triangle_counts()
+        coefficients = array('d', bytes(8 * self._n_slots))
+        for i in range(self._n_slots):
+            degree = offsets[i + 1] - offsets[i]
+            if degree >= 2:
+                coefficients[i] = 2 * triangles[i] / (degree * (degree - 1))
+        return coefficients
+
+    def top_core(self, k: int):
+        """
+        The k users with the highest core numbers.
+
+        Returns:
+            LinkedList of (username, core number) tuples, highest first; ties are
+            broken by usernames order
+
+        Raises:
+            ValueError: if k is less than 1
+
+        Time complexity: O(V log k) plus core_numbers
+        """
+        if k < 1:
+            raise ValueError("Need room for at least one user.")
+        cores = self.core_numbers()
+        best = ArrayMinHeap(max(1, min(k, self.num_users)))
+        for i in range(self._n_slots):
+            if self.usernames[i] is None:
+                continue
+            entry = (cores[i], -i)
+            if not best.is_full():
+                best.push(entry)
+            elif best.peek() < entry:
+                best.replace(entry)
+
+        return self._best_first(best)
+
+    def minhash_index(self, num_hashes: int = 64, bands: int = 16, seed: int = 1008) -> MinHashIndex:
+        """
+        MinHash signatures of every user's follow list with an LSH banding index
+        (see MinHashIndex). The defaults make pairs that share about half their
+        follows likely to meet in a bucket. Cached until the graph changes.
+
+        Raises:
+            ValueError: if num_hashes is not a positive multiple of bands
+
+        Time complexity: O(1) expected if the graph is unchanged since the last call
+        with the same arguments, otherwise O(V * num_hashes + E) expected
+        """
+        return self._cached(f"minhash_index {num_hashes} {bands} {seed}",
+                            lambda: MinHashIndex(self._graph, num_hashes, bands, seed))
+
+    def estimate_jaccard(self, username1: str, username2: str) -> float:
+        """
+        Estimate the Jaccard similarity of the follow lists of two users from
+        their MinHash signatures (0.0 if either follows nobody).
+
+        Raises:
+            ValueError: if either user is unknown
+
+        Time complexity: O(signature length) once minhash_index is built
+        """
+        index1 = self._require_user_index(username1)
+        index2 = self._require_user_index(username2)
+        return self.minhash_index().estimate(index1, index2)
+
+    def similar_users(self, username: str, threshold: float = 0.5):
+        """
+        Users whose follow lists look like a near-duplicate of username's: the
+        LSH candidates whose estimated Jaccard similarity reaches threshold.
+
+        Returns:
+            LinkedList of (username, estimated similarity) tuples, in usernames order
+
+        Raises:
+            ValueError: if the user is unknown
+
+        Time complexity: O(C * signature length) for C candidates, once
+        minhash_index is built
+        """
+        index = self._require_user_index(username)
+        signatures = self.minhash_index()
+        similar = LinkedList()
+        candidates = signatures.candidates(index)
+        for k in range(len(candidates)):
+            estimate = signatures.estimate(index, candidates[k])
+            if estimate >= threshold:
+                similar.append((self.usernames[candidates[k]], estimate))
+        return similar
+
+    def near_duplicates(self, threshold: float = 0.5):
+        """
+        Every pair of users with near-duplicate follow lists, a strong hint of
+        sockpuppet accounts: the pairs meeting in an LSH bucket whose estimated
+        Jaccard similarity reaches threshold.
+
+        Returns:
+            LinkedList of (username1, username2, estimated similarity) tuples, with
+            username1 before username2 in usernames, ordered by username1 then username2
+
+        Time complexity: O(V + P * signature length) for P candidate pairs, once
+        minhash_index is built
+        """
+        signatures = self.minhash_index()
+        pairs = LinkedList()
+        for u in range(self._n_slots):
+            candidates = signatures.candidates(u)
+            for k in range(len(candidates)):
+                v = candidates[k]
+                if v > u:
+                    estimate = signatures.estimate(u, v)
+                    if estimate >= threshold:
+                        pairs.append((self.usernames[u], self.usernames[v], estimate))
+        return pairs
+
+    def _best_first(self, best: ArrayMinHeap):
+        """
+        Empty a heap of (score, -user index) entries into a LinkedList of
+        (username, score) tuples, highest score first.
+
+        Time complexity: O(k log k) for k entries
+        """
+        size = len(best)
+        ranked = ArrayR(max(1, size))
+        for position in range(size - 1, -1, -1):
+            score, negated = best.pop()
+            ranked[position] = (self.usernames[-negated], score)
+        result = LinkedList()
+        for position in range(size):
+            result.append(ranked[position])
+        return result
+
+    def suggest(self, username: str, k: int):
+        """
+        People you may know: the users sharing the most mutual friends with
+        username, among those they do not follow yet.
+
+        Every mutual friend of the user votes for each of their own mutual
+        friends; the k best are kept in a bounded heap.
+
+        Args:
+            username: User to suggest friends for
+            k: Largest number of suggestions
+
+        Returns:
+            LinkedList of (username, number of shared mutual friends) tuples, best
+            first; ties are broken by usernames order
+
+        Raises:
+            ValueError: if the user is unknown or k is less than 1
+
+        Time complexity: O(V / W + S + C log k) where S is the total number of
+        connections of the user's mutual friends and C the number of candidates
+        (the V / W term is a C-level clear of the vote counters)
+        """
+        index = self._require_user_index(username)
+        return self._rank_suggestions(index, k, self._mutual_row, _filled('i', self._n_slots, 0))
+
+    def suggest_many(self, usernames, k: int):
+        """
+        suggest for many users at once. The mutual friends of every user are
+        found in a single pass over the graph and shared by all the rankings,
+        instead of being merged again for each user that needs them.
+
+        Args:
+            usernames: Collection of users to suggest friends for
+            k: Largest number of suggestions per user
+
+        Returns:
+            LinkedList holding the result of suggest for each user, in input order
+
+        Raises:
+            ValueError: if a user is unknown or k is less than 1
+
+        Time complexity: O(V + E) for the pass (see _mutual_rows), then see suggest
+        for each user
+        """
+        indices = array('i')
+        for username in usernames:
+            indices.append(self._require_user_index(username))
+
+        offsets, targets = self._mutual_rows()
+
+        def mutual_row(i):
+            return targets[offsets[i]:offsets[i + 1]]
+
+        votes = _filled('i', self._n_slots, 0)
+        results = LinkedList()
+        for index in indices:
+            results.append(self._rank_suggestions(index, k, mutual_row, votes))
+        return results
+
+    def _rank_suggestions(self, index: int, k: int, mutual_row, votes):
+        """
+        Core of suggest: count votes into votes (all zero, and left all zero on
+        return), using mutual_row(i) for the mutual friends of user i.
+
+        Only votes is written, never the scratch marks of the cluster queries,
+        so suggestions can be asked for while iter_ai_clusters_1008_2085 is
+        being consumed.
+        """
+        if k < 1:
+            raise ValueError("Need room for at least one suggestion.")
+
+        # The user and everyone they follow are not candidates: their counters
+        # are set to -1 while votes are counted
+        following = self._graph.successors(index)
+        votes[index] = -1
+        for j in range(len(following)):
+            votes[following[j]] = -1
+
+        candidates = array('i')
+        friends = mutual_row(index)
+        for f in range(len(friends)):
+            their_friends = mutual_row(friends[f])
+            for j in range(len(their_friends)):
+                candidate = their_friends[j]
+                if votes[candidate] >= 0:
+                    if votes[candidate] == 0:
+                        candidates.append(candidate)
+                    votes[candidate] += 1
+
+        votes[index] = 0
+        for j in range(len(following)):
+            votes[following[j]] = 0
+
+        # Keep the k best as (votes, -index), so the smallest index wins ties
+        best = ArrayMinHeap(max(1, min(k, len(candidates))))
+        for candidate in candidates:
+            entry = (votes[candidate], -candidate)
+            votes[candidate] = 0
+            if not best.is_full():
+                best.push(entry)
+            elif best.peek() < entry:
+                best.replace(entry)
+
+        return self._best_first(best)
+
+    def k_hop(self, username: str, k: int, mutual_only: bool = False):
+        """
+        The audience within k hops: every user reachable from username by following
+        at most k follows (or mutual friendships, with mutual_only).
+
+        Args:
+            username: User to start from; not part of the result
+            k: Largest number of hops
+            mutual_only: Only walk between mutual friends
+
+        Returns:
+            LinkedList of usernames, nearest first and in usernames order within each hop
+
+        Raises:
+            ValueError: if the user is unknown or k is negative
+
+        Time complexity: O(V / W + R + E(R)) for R users reached and E(R) their
+        connections, the V / W term being the C-level frontier maps and scans
+        """
+        index = self._require_user_index(username)
+        if k < 0:
+            raise ValueError("Number of hops cannot be negative.")
+        audience = LinkedList()
+        levels = self._bfs_levels(index, True, mutual_only)
+        next(levels)
+        for _ in range(k):
+            frontier = next(levels, None)
+            if frontier is None:
+                break
+            v = frontier[0].find(1)
+            while v >= 0:
+                audience.append(self.usernames[v])
+                v = frontier[0].find(1, v + 1)
+        return audience
+
+    def reachable(self, username1: str, username2: str, max_hops: int,
+                  mutual_only: bool = False, bidirectional: bool = True) -> bool:
+        """
+        Check if username2 can be reached from username1 in at most max_hops follows
+        (or mutual friendships, with mutual_only).
+
+        Bidirectional mode searches forwards from username1 and backwards from
+        username2 at the same time, always growing the smaller frontier, and
+        stops as soon as they meet; both searches stay around the square root of
+        the size of a one-sided search on graphs that spread out quickly.
+
+        Raises:
+            ValueError: if either user is unknown or max_hops is negative
+
+        Time complexity: O(V / W + R + E(R)) for the R users reached, see k_hop
+        """
+        index1 = self._require_user_index(username1)
+        index2 = self._require_user_index(username2)
+        if max_hops < 0:
+            raise ValueError("Number of hops cannot be negative.")
+        if index1 == index2:
+            return True
+
+        forward = self._bfs_levels(index1, True, mutual_only)
+        forward_frontier, forward_unvisited = next(forward)
+        if not bidirectional:
+            for _ in range(max_hops):
+                level = next(forward, None)
+                if level is None:
+                    return False
+                if level[0][index2]:
+                    return True
+            return False
+
+        backward = self._bfs_levels(index2, False, mutual_only)
+        backward_frontier, backward_unvisited = next(backward)
+        for _ in range(max_hops):
+            # Grow the smaller side, and look for its new users on the other side
+            if forward_frontier.count(1) <= backward_frontier.count(1):
+                level = next(forward, None)
+                if level is None:
+                    return False
+                forward_frontier = level[0]
+                new, other_unvisited = forward_frontier, backward_unvisited
+            else:
+                level = next(backward, None)
+                if level is None:
+                    return False
+                backward_frontier = level[0]
+                new, other_unvisited = backward_frontier, forward_unvisited
+            v = new.find(1)
+            while v >= 0:
+                if not other_unvisited[v]:
+                    return True
+                v = new.find(1, v + 1)
+        return False
+
+    def _bfs_levels(self, source: int, forward: bool, mutual_only: bool):
+        """
+        Level-synchronous breadth-first search from source, following edges
+        forwards (successors) or backwards (predecessors), or only mutual ones.
+
+        Frontiers are maps with one byte per user, so their members are found by
+        bytearray.find in C. Each level is expanded top-down (the edges out of the
+        frontier) or, when the frontier is large (see BOTTOM_UP_FACTOR), bottom-up:
+        each unvisited user looks for a parent in the frontier and stops at the first.
+
+        Yields:
+            (frontier, unvisited) for level 0 (the source), 1, ... until a level is
+            empty: frontier marks the users first reached at that level, and
+            unvisited, updated in place, those not reached yet
+
+        Time complexity: O(V / W) per level plus O(1) per user and edge examined
+        """
+        graph = self._graph
+        n = self._n_slots
+
+        def out_row(u):
+            if mutual_only:
+                return self._mutual_row(u)
+            return graph.successors(u) if forward else graph.predecessors(u)
+
+        def in_row(v):
+            if mutual_only:
+                return self._mutual_row(v)
+            return graph.predecessors(v) if forward else graph.successors(v)
+
+        unvisited = bytearray(b"\x01") * n
+        frontier = bytearray(n)
+        unvisited[source] = 0
+        frontier[source] = 1
+        frontier_edges = len(out_row(source))
+        unvisited_edges = graph.number_of_edges() - len(in_row(source))
+        yield frontier, unvisited
+
+        while True:
+            reached = bytearray(n)
+            if frontier_edges * Connections.BOTTOM_UP_FACTOR > unvisited_edges:
+                v = unvisited.find(1)
+                while v >= 0:
+                    parents = in_row(v)
+                    for k in range(len(parents)):
+                        if frontier[parents[k]]:
+                            reached[v] = 1
+                            break
+                    v = unvisited.find(1, v + 1)
+            else:
+                u = frontier.find(1)
+                while u >= 0:
+                    children = out_row(u)
+                    for k in range(len(children)):
+                        if unvisited[children[k]]:
+                            reached[children[k]] = 1
+                    u = frontier.find(1, u + 1)
+
+            frontier = reached
+            frontier_edges = 0
+            v = frontier.find(1)
+            if v < 0:
+                return
+            while v >= 0:
+                unvisited[v] = 0
+                frontier_edges += len(out_row(v))
+                unvisited_edges -= len(in_row(v))
+                v = frontier.find(1, v + 1)
+            yield frontier, unvisited
+
+    def strongly_connected_components(self):
+        """
+        Strongly connected components of the follow graph: groups where everyone
+        can reach everyone else by following follows, such as one-directional
+        follow rings that mutual friendships do not show. See
+        Graph.strongly_connected_components; removed users are components of
+        their own.
+
+        Returns:
+            (component, sizes) typed arrays: the component number of every user,
+            and the size of every component. Cached until the graph changes, so
+            they must not be modified.
+
+        Time complexity: O(1) expected if the graph is unchanged since the last call,
+        otherwise O(V + E)
+        """
+        return self._cached("strongly_connected_components", self._graph.strongly_connected_components)
+
+    def follow_rings(self, min_size: int = 2):
+        """
+        Find the strongly connected components of at least min_size users.
+
+        Returns:
+            LinkedList of LinkedLists of usernames, ordered by their first user in
+            usernames, each listing its users in usernames order
+
+        Time complexity: O(V) plus strongly_connected_components
+        """
+        component, sizes = self.strongly_connected_components()
+
+        # Bucket the users by component, in usernames order within each
+        start = _filled('q', len(sizes) + 1, 0)
+        for c in range(len(sizes)):
+            start[c + 1] = start[c] + sizes[c]
+        cursor = array('q', start)
+        members = _filled('i', self._n_slots, 0)
+        for i in range(self._n_slots):
+            members[cursor[component[i]]] = i
+            cursor[component[i]] += 1
+
+        # Each component is listed when its first user is met
+        rings = LinkedList()
+        for i in range(self._n_slots):
+            c = component[i]
+            if sizes[c] < min_size or members[start[c]] != i:
+                continue
+            ring = LinkedList()
+            for k in range(start[c], start[c + 1]):
+                ring.append(self.usernames[members[k]])
+            rings.append(ring)
+        return rings
+
+    def condensation(self) -> CSRGraph:
+        """
+        The condensation DAG: one vertex per strongly connected component (numbered
+        as in strongly_connected_components) and an edge between two components
+        when a user of the first follows a user of the second. Every edge goes
+        from a higher component number to a lower one.
+
+        Time complexity: O(V + E)
+        """
+        component, sizes = self.strongly_connected_components()
+        sources = array('i')
+        targets = array('i')
+        for u in range(self._n_slots):
+            following = self._graph.successors(u)
+            for k in range(len(following)):
+                if component[following[k]] != component[u]:
+                    sources.append(component[u])
+                    targets.append(component[following[k]])
+        return CSRGraph.from_edges(len(sizes), sources, targets)
+
+    def add_user(self, username: str) -> None:
+        """
+        Add a new user with no connections.
+
+        A user without connections is a bot and a FIT1054 cluster on their own.
+
+        Raises:
+            ValueError: if the username is already taken
+
+        Time complexity: O(1) amortised expected; O(V) when the per-user arrays grow
+        """
+        if self._get_user_index(username) >= 0:
+            raise ValueError(f"User {username} already exists.")
+        self._thaw()
+        if self._n_slots == len(self.usernames):
+            self._grow()
+
+        index = self._graph.add_vertex()
+        self._graph_changed()
+        self.usernames[index] = username
+        self._index[username] = index
+        self._n_slots += 1
+        self.num_users += 1
+
+        self._unreciprocated_out.append(0)
+        self._unreciprocated_in.append(0)
+        self._is_bot_flag.append(False)
+        self._cluster_leader.append(-1)
+        self._included.append(0)
+        if self._follow_bits is not None:
+            self._follow_bits[index] = 0
+            self._follower_bits[index] = 0
+
+        self._refresh_bot(index)
+        self._recheck_cluster_1054(index)
+
+    def _grow(self) -> None:
+        """
+        Double the capacity of the per-user ArrayRs; the typed per-user
+        arrays grow by themselves as users are appended.
+
+        Time complexity: O(V)
+        """
+        capacity = max(1, 2 * len(self.usernames))
+        self.usernames = self._resized(self.usernames, capacity)
+        if self._follow_bits is not None:
+            self._follow_bits = self._resized(self._follow_bits, capacity)
+            self._follower_bits = self._resized(self._follower_bits, capacity)
+
+    def _resized(self, old, capacity: int):
+        """ Copy of the used slots of an ArrayR in a new ArrayR of the given capacity. """
+        bigger = ArrayR(capacity)
+        for i in range(self._n_slots):
+            bigger[i] = old[i]
+        return bigger
+
+    def follow(self, username1: str, username2: str) -> None:
+        """
+        Make username1 follow username2. Following someone twice has no effect.
+
+        Raises:
+            ValueError: if either user is unknown, or a user tries to follow themselves
+
+        Time complexity: O(d + k * d) where d bounds the connections of the two users
+        and k the size of the clusters they end up in
+        """
+        index1 = self._require_user_index(username1)
+        index2 = self._require_user_index(username2)
+        if index1 == index2:
+            raise ValueError("Users cannot follow themselves.")
+        if self._graph.has_edge(index1, index2):
+            return
+
+        self._thaw()
+        self._dissolve_cluster_1054(index1)
+        self._dissolve_cluster_1054(index2)
+        self._add_edge(index1, index2)
+        self._recheck_cluster_1054(index1)
+        self._recheck_cluster_1054(index2)
+
+    def unfollow(self, username1: str, username2: str) -> None:
+        """
+        Make username1 stop following username2. Has no effect if they did not follow.
+
+        Raises:
+            ValueError: if either user is unknown
+
+        Time complexity: see follow
+        """
+        index1 = self._require_user_index(username1)
+        index2 = self._require_user_index(username2)
+        if not self._graph.has_edge(index1, index2):
+            return
+
+        self._thaw()
+        self._dissolve_cluster_1054(index1)
+        self._dissolve_cluster_1054(index2)
+        self._remove_edge(index1, index2)
+        self._recheck_cluster_1054(index1)
+        self._recheck_cluster_1054(index2)
+
+    def remove_user(self, username: str) -> None:
+        """
+        Remove a user together with every follow they make or receive.
+        Their slot in usernames becomes None.
+
+        Raises:
+            ValueError: if the user is unknown
+
+        Time complexity: O(d * (d + k)) where d is the number of connections of
+        the user (in both directions) and k bounds the clusters re-examined
+        """
+        index = self._require_user_index(username)
+        self._thaw()
+        following = self._graph.successors(index)
+        followers = self._graph.predecessors(index)
+
+        # Everyone this user touches may leave or join a cluster
+        self._dissolve_cluster_1054(index)
+        for k in range(len(following)):
+            self._dissolve_cluster_1054(following[k])
+        for k in range(len(followers)):
+            self._dissolve_cluster_1054(followers[k])
+
+        # The graph shrinks these rows as edges go, so always take the last one
+        neighbours = LinkedList()
+        while len(following) > 0:
+            neighbour = following[len(following) - 1]
+            neighbours.append(neighbour)
+            self._remove_edge(index, neighbour)
+        while len(followers) > 0:
+            neighbour = followers[len(followers) - 1]
+            neighbours.append(neighbour)
+            self._remove_edge(neighbour, index)
+
+        # Retire the slot
+        self._is_bot_flag[index] = False
+        del self._index[username]
+        self.usernames[index] = None
+        self.num_users -= 1
+        self._graph_changed()
+
+        for neighbour in neighbours:
+            self._recheck_cluster_1054(neighbour)
+
+    def _add_edge(self, index1: int, index2: int) -> None:
+        """
+        Add the follow index1 -> index2 and update the one-sided follow
+        counters, bot flags and bitmaps of both users.
+
+        Time complexity: O(d)
+        """
+        if self._graph.has_edge(index2, index1):
+            # index2's follow of index1 is now returned
+            self._unreciprocated_in[index1] -= 1
+            self._unreciprocated_out[index2] -= 1
+        else:
+            self._unreciprocated_out[index1] += 1
+            self._unreciprocated_in[index2] += 1
+        self._graph.add_edge(index1, index2)
+        self._graph_changed()
+        if self._follow_bits is not None:
+            self._follow_bits[index1] |= 1 << index2
+            self._follower_bits[index2] |= 1 << index1
+        self._refresh_bot(index1)
+        self._refresh_bot(index2)
+
+    def _remove_edge(self, index1: int, index2: int) -> None:
+        """
+        Remove the follow index1 -> index2; the reverse of _add_edge.
+
+        Time complexity: O(d)
+        """
+        if self._graph.has_edge(index2, index1):
+            # index2's follow of index1 is no longer returned
+            self._unreciprocated_in[index1] += 1
+            self._unreciprocated_out[index2] += 1
+        else:
+            self._unreciprocated_out[index1] -= 1
+            self._unreciprocated_in[index2] -= 1
+        self._graph.remove_edge(index1, index2)
+        self._graph_changed()
+        if self._follow_bits is not None:
+            self._follow_bits[index1] &= ~(1 << index2)
+            self._follower_bits[index2] &= ~(1 << index1)
+        self._refresh_bot(index1)
+        self._refresh_bot(index2)
+
+    @property
+    def version(self) -> int:
+        """ Graph version: changes with every edit that changes the graph. """
+        return self._version
+
+    def _graph_changed(self) -> None:
+        """ Record an edit: bump the version and drop the cached query results,
+        and the bot and leader indices derived from the flags. """
+        self._version += 1
+        self._bot_order = None
+        self._leader_order = None
+        if not self._cache.is_empty():
+            self._cache.clear()
+
+    def _cached(self, name: str, compute):
+        """
+        The result of a whole-graph query, computed by compute() on a miss and
+        kept until the graph changes.
+
+        Time complexity: O(1) expected on a hit
+        """
+        entry = self._cache.get(name)
+        if entry is not None and entry[0] == self._version:
+            self.cache_hits += 1
+            return entry[1]
+        self.cache_misses += 1
+        result = compute()
+        self._cache[name] = (self._version, result)
+        return result
+
+    @staticmethod
+    def _collect(clusters):
+        """ LinkedList of the clusters generated by one of the iter_ai_clusters methods. """
+        collected = LinkedList()
+        for cluster in clusters:
+            collected.append(cluster)
+        return collected
+
+    def get_ai_clusters_1008_2085(self, workers: int = 1):
         """
         Find AI clusters for FIT1008/2085.
-        
+
         An AI cluster is formed when a user (bot) is mutual friends with ALL of their connections.
         The cluster includes the bot and all their friends.
-        
+
+        Args:
+            workers: With more than one, the bots are found again by a fresh _scan
+                of the graph on that many processes rather than read from the state
+                kept up to date by edits; the clusters are the same.
+
         Returns:
             Collection of collections, where each inner collection contains users in one cluster
-            with the bot (cluster center) as the first element.
+            with the bot (cluster center) as the first element. The result is cached
+            until the graph changes and shared between calls, so it must not be modified.
+
+        Time complexity: O(1) expected if the graph is unchanged since the last call,
+        otherwise O(B + D) where B is the number of bots and D the total number of
+        their connections, plus a C-level O(V) search for the bots after an edit
+        (see _bot_indices); O(V + E) expected with more than one worker
         """
-        # Track which users have already been included in clusters using ArrayR
-        included_in_cluster = ArrayR(self.num_users)
-        for i in range(self.num_users):
-            included_in_cluster[i] = False
-            
-        # Store the clusters
-        clusters = LinkedList()
-        
-        # Check each user to see if they're a bot (center of a cluster)
-        for i in range(self.num_users):
-            username = self.usernames[i]
-            
+        if workers > 1:
+            return self._collect(self.iter_ai_clusters_1008_2085(workers))
+        return self._cached("ai_clusters_1008_2085", lambda: self._collect(self.iter_ai_clusters_1008_2085()))
+
+    def iter_ai_clusters_1008_2085(self, workers: int = 1):
+        """
+        Generate the FIT1008/2085 clusters one at a time, in the order of
+        get_ai_clusters_1008_2085, without holding the ones already yielded.
+
+        Each cluster is final when it is yielded. Only the included-in-cluster
+        marks stay resident between clusters; the graph must not be edited, nor
+        another FIT1008/2085 query run, until the generator is exhausted.
+
+        Args:
+            workers: See get_ai_clusters_1008_2085
+
+        Yields:
+            LinkedList of usernames with the bot first
+
+        Time complexity: O(B + D) over the whole iteration, see get_ai_clusters_1008_2085
+        """
+        bots = self._bot_indices()
+        if workers > 1:
+            unreciprocated_out, unreciprocated_in, _, _ = self._scan(workers)
+            bots = array('i')
+            for i in range(self._n_slots):
+                if unreciprocated_out[i] == 0 and unreciprocated_in[i] == 0 and self.usernames[i] is not None:
+                    bots.append(i)
+
+        # Track which users have already been included in clusters; a new stamp
+        # clears the marks left by previous queries without touching the array
+        self._stamp += 1
+        included_in_cluster = self._included
+        stamp = self._stamp
+
+        # Only bots can be the center of a cluster, so walk them in user order
+        for b in range(len(bots)):
+            i = bots[b]
+
             # Skip if this user is already in a cluster
-            if included_in_cluster[i]:
+            if included_in_cluster[i] == stamp:
                 continue
-                
-            # Check if this user is a bot
-            if self._is_bot(username):
-                # Create a new cluster with this bot as center
-                cluster = LinkedList()
-                cluster.prepend(username)  # Bot is first in cluster
-                included_in_cluster[i] = True
-                
-                # Add all friends of the bot to the cluster (if not already in other clusters)
-                for friend_username in self.connections[i]:
-                    friend_index = self._get_user_index(friend_username)
-                    if not included_in_cluster[friend_index]:
-                        cluster.append(friend_username)
-                        included_in_cluster[friend_index] = True
-                
-                # Add this cluster to our collection of clusters
-                clusters.append(cluster)
-        
-        return clusters
-    
+
+            # Create a new cluster with this bot as center
+            cluster = LinkedList()
+            cluster.append(self.usernames[i])  # Bot is first in cluster
+            included_in_cluster[i] = stamp
+
+            # Add all friends of the bot to the cluster (if not already in other clusters)
+            following = self._graph.successors(i)
+            for k in range(len(following)):
+                friend_index = following[k]
+                if included_in_cluster[friend_index] != stamp:
+                    cluster.append(self.usernames[friend_index])
+                    included_in_cluster[friend_index] = stamp
+
+            yield cluster
+
+    def bots(self):
+        """
+        Find every bot on the platform.
+
+        Returns:
+            LinkedList of the usernames of all bots, in the order of usernames. The
+            result is cached until the graph changes and must not be modified.
+
+        Time complexity: O(1) expected if the graph is unchanged since the last call,
+        otherwise O(B) where B is the number of bots, plus a C-level O(V) search
+        for them after an edit (see _bot_indices)
+        """
+        return self._cached("bots", self._list_bots)
+
+    def _list_bots(self):
+        """ Uncached bots(). """
+        result = LinkedList()
+        bots = self._bot_indices()
+        for b in range(len(bots)):
+            result.append(self.usernames[bots[b]])
+        return result
+
+    def _bot_indices(self) -> array:
+        """
+        Ascending indices of all bots: found by the build or read from the
+        snapshot, and after an edit gathered again from the bot flags, once
+        per graph version. Edits only flip flags, so they stay O(1) each.
+
+        Time complexity: O(1) if known for this graph version, otherwise O(B)
+        plus an O(V) search of the flags in C (bytes.find)
+        """
+        if self._bot_order is None:
+            bots = array('i')
+            flags = bytes(self._is_bot_flag)
+            i = flags.find(1)
+            while i >= 0:
+                bots.append(i)
+                i = flags.find(1, i + 1)
+            self._bot_order = bots
+        return self._bot_order
+
     def _is_bot(self, username: str) -> bool:
         """
         Helper method to determine if a user is a bot.
-        
+
         A user is a bot if they are mutual friends with ALL of their connections
         AND has no one-sided incoming connections.
-        
+
         Args:
             username: Username to check
-            
+
         Returns:
             True if user is a bot, False otherwise
+
+        Raises:
+            ValueError: if the user is unknown
+
+        Time complexity: O(1) expected, reading the flag kept up to date by edits
         """
-        user_index = self._get_user_index(username)
-        user_friends = self.connections[user_index]
-        
-        # Check if user is mutual friends with ALL their connections
-        for friend_username in user_friends:
-            if not self.mutual_friends(username, friend_username):
-                return False
-        
-        # Also check if anyone follows this user that they don't follow back
-        for i in range(self.num_users):
-            other_username = self.usernames[i]
-            if other_username != username:
-                # Check if other_username follows this user
-                for friend in self.connections[i]:
-                    if friend == username:
-                        # other_username follows this user
-                        # Check if this user follows back
-                        follows_back = False
-                        for user_friend in user_friends:
-                            if user_friend == other_username:
-                                follows_back = True
-                                break
-                        if not follows_back:
-                            return False
-        
-        return True
-    
-    def get_ai_clusters_1054(self):
+        return self._is_bot_flag[self._require_user_index(username)] == 1
+
+    def _is_bot_index(self, user_index: int) -> bool:
+        """
+        Bot check by user index: no one-sided follows in either direction.
+
+        Time complexity: O(1)
+        """
+        return self._unreciprocated_out[user_index] == 0 and self._unreciprocated_in[user_index] == 0
+
+    def _refresh_bot(self, user_index: int) -> None:
+        """
+        Bring the bot flag in line with the counters.
+
+        Time complexity: O(1)
+        """
+        self._is_bot_flag[user_index] = self._is_bot_index(user_index)
+
+    def get_ai_clusters_1054(self, workers: int = 1):
         """
         Find AI clusters for FIT1054.
-        
+
         An AI cluster is a group where all users are mutual friends with each other
         and have no connections outside the group.
-        
+
+        Args:
+            workers: With more than one, the clusters are found again by a fresh
+                _scan of the graph on that many processes rather than read from the
+                state kept up to date by edits; the result is the same.
+
         Returns:
             Collection of collections, where each inner collection contains users in one cluster.
+            Clusters are ordered by their first user in usernames, and list their users in
+            usernames order. The result is cached until the graph changes and shared
+            between calls, so it must not be modified.
+
+        Time complexity: O(1) expected if the graph is unchanged since the last call,
+        otherwise O(M) where M is the number of users in clusters, plus O(V) to
+        gather the leaders after an edit (see _leader_indices); cluster membership
+        is maintained as the graph is edited. O(V + E) expected with more than one worker.
         """
-        # Track which users have been visited using ArrayR
-        visited = ArrayR(self.num_users)
-        for i in range(self.num_users):
-            visited[i] = False
-            
-        clusters = LinkedList()
-        
-        # Use BFS-like approach to find connected components
-        for i in range(self.num_users):
-            if not visited[i]:
-                cluster = self._find_cluster_1054(i, visited)
-                if cluster is not None:
-                    clusters.append(cluster)
-                    
-        return clusters
-    
-    def _find_cluster_1054(self, start_index: int, visited):
-        """
-        Helper method to find a cluster starting from a given user index for FIT1054.
-        
-        Uses BFS to find all mutually connected users with no external connections.
-        """
-        # Use a queue for BFS
-        stack = ArrayStack(self.num_users)
-        cluster = LinkedList()
-        
-        stack.append_right(start_index)
-        visited[start_index] = True
-        cluster.append(self.usernames[start_index])
-        
-        while not stack.is_empty():
-            current_index = stack.serve_left()
-            current_user = self.usernames[current_index]
-            
-            # Check all friends of current user
-            for friend_username in self.connections[current_index]:
-                friend_index = self._get_user_index(friend_username)
-                if not visited[friend_index]:
-                    # Check if this friend should be in the same cluster
-                    if self._should_be_in_same_cluster_1054(current_user, friend_username):
-                        visited[friend_index] = True
-                        stack.append_right(friend_index)
-                        cluster.append(friend_username)
-        
-        # Verify the cluster is valid (all pairs are mutual friends and no external connections)
-        if self._is_valid_cluster_1054(cluster):
-            return cluster
-        else:
-            return None
-    
-    def _should_be_in_same_cluster_1054(self, user1: str, user2: str) -> bool:
+        if workers > 1:
+            return self._collect(self.iter_ai_clusters_1054(workers))
+        return self._cached("ai_clusters_1054", lambda: self._collect(self.iter_ai_clusters_1054()))
+
+    def iter_ai_clusters_1054(self, workers: int = 1):
+        """
+        Generate the FIT1054 clusters one at a time, in the order of
+        get_ai_clusters_1054, without holding the ones already yielded.
+
+        The graph must not be edited until the generator is exhausted.
+
+        Args:
+            workers: See get_ai_clusters_1054
+
+        Yields:
+            LinkedList of the usernames in one cluster, in usernames order
+
+        Time complexity: O(M) over the whole iteration, see get_ai_clusters_1054
+        """
+        leaders = self._leader_indices()
+        if workers > 1:
+            unreciprocated_out, _, mutual_degree, components = self._scan(workers)
+            _, leaders = self._label_clusters_1054(components, mutual_degree, unreciprocated_out)
+
+        for c in range(len(leaders)):
+            # A cluster is a clique, so its leader's connections are everyone else,
+            # all of them later in usernames than the leader
+            leader = leaders[c]
+            cluster = LinkedList()
+            cluster.append(self.usernames[leader])
+            following = self._graph.successors(leader)
+            for k in range(len(following)):
+                cluster.append(self.usernames[following[k]])
+            yield cluster
+
+    def _leader_indices(self) -> array:
+        """
+        Ascending indices of the FIT1054 cluster leaders, the users who lead
+        their own cluster; like _bot_indices, known after the build or from the
+        snapshot, otherwise gathered once per graph version.
+
+        Time complexity: O(1) if known for this graph version, otherwise O(V)
+        """
+        if self._leader_order is None:
+            leaders = array('i')
+            cluster_leader = self._cluster_leader
+            for i in range(self._n_slots):
+                if cluster_leader[i] == i:
+                    leaders.append(i)
+            self._leader_order = leaders
+        return self._leader_order
+
+    def _label_clusters_1054(self, components: DisjointSet, mutual_degree, unreciprocated_out):
+        """
+        Label every user with their FIT1054 cluster from scratch, given the
+        components of the mutual edges and the counters from _scan.
+
+        Returns:
+            (cluster_leader, leaders): the leader of every user's cluster (-1 for
+            none), and the leaders of all clusters in ascending order
+
+        A component is a cluster exactly when none of its members follows anyone
+        one-sidedly (which also keeps every connection inside the component) and
+        every member has a mutual friend in each of the other members.
+
+        Time complexity: O(V) expected
+        """
+        n = self._n_slots
+
+        # Per-component validity: no one-sided follows, and a clique
+        valid = _filled('b', n, True)
+        for i in range(n):
+            root = components.find(i)
+            if unreciprocated_out[i] != 0 or mutual_degree[i] != components.size_of(root) - 1:
+                valid[root] = False
+
+        # The first member of a component in usernames order leads its cluster;
+        # removed users are left out
+        cluster_leader = _filled('i', n, -1)
+        leaders = array('i')
+        leader_of_root = _filled('i', n, -1)
+        for i in range(n):
+            root = components.find(i)
+            if valid[root] and self.usernames[i] is not None:
+                if leader_of_root[root] < 0:
+                    leader_of_root[root] = i
+                    leaders.append(i)
+                cluster_leader[i] = leader_of_root[root]
+        return cluster_leader, leaders
+
+    def _dissolve_cluster_1054(self, user_index: int) -> None:
+        """
+        Drop the FIT1054 cluster containing the user, if any, before an edit
+        that may invalidate it. Must run while the graph still holds the cluster.
+
+        Time complexity: O(k) for a cluster of k users
         """
-        Check if two users should be in the same cluster for FIT1054.
+        leader = self._cluster_leader[user_index]
+        if leader < 0:
+            return
+        self._cluster_leader[leader] = -1
+        following = self._graph.successors(leader)
+        for k in range(len(following)):
+            self._cluster_leader[following[k]] = -1
+
+    def _recheck_cluster_1054(self, user_index: int) -> None:
         """
-        return self.mutual_friends(user1, user2)
-    
-    def _is_valid_cluster_1054(self, cluster) -> bool:
+        After an edit touching the user, check whether they and their
+        connections now form a FIT1054 cluster, and record it if so.
+
+        Only clusters containing an edited user can change: the connections of
+        everyone else are untouched, and a closed group cannot reach the edited users.
+
+        Time complexity: O(k^2 log k) where k is the number of connections of the user
+        """
+        if self.usernames[user_index] is None or self._cluster_leader[user_index] >= 0:
+            return
+        following = self._graph.successors(user_index)
+        size = len(following) + 1
+
+        # Every member must return all their follows and follow every other member
+        if not self._is_clique_member(user_index, user_index, size):
+            return
+        for k in range(len(following)):
+            if not self._is_clique_member(following[k], user_index, size):
+                return
+
+        leader = user_index
+        if len(following) > 0 and following[0] < leader:
+            leader = following[0]
+        self._cluster_leader[user_index] = leader
+        for k in range(len(following)):
+            self._cluster_leader[following[k]] = leader
+
+    def _is_clique_member(self, member: int, centre: int, size: int) -> bool:
+        """
+        Check one member of the candidate group made of centre and its connections:
+        all their follows are returned, and they follow exactly the other members.
+
+        Time complexity: O(d log d) where d is the number of connections of the centre
+        """
+        if self._unreciprocated_out[member] != 0 or self._graph.out_degree(member) != size - 1:
+            return False
+        # size - 1 follows, all inside the group and none to themselves, cover the group
+        following = self._graph.successors(member)
+        for k in range(len(following)):
+            friend_index = following[k]
+            if friend_index != centre and not self._graph.has_edge(centre, friend_index):
+                return False
+        return True
+
+    def _is_valid_cluster_1054(self, cluster, use_triangles: bool = False) -> bool:
         """
         Verify that a cluster is valid for FIT1054:
         - All pairs in the cluster are mutual friends
         - No one in the cluster has connections outside the cluster
+
+        This is a standalone checker for a given group of users, e.g. to audit
+        clusters from elsewhere; the cluster queries do not call it, as they
+        find clusters from the maintained state (see _recheck_cluster_1054).
+
+        With use_triangles, the clique test reads triangle_counts instead of
+        checking every member's connections: when a member's k - 1 mutual
+        friends are the rest of the cluster and close (k - 1)(k - 2) / 2
+        triangles among themselves, the cluster is a clique, and it is closed
+        when nobody in it has other mutual friends or one-sided follows.
+
+        Raises:
+            ValueError: if a username is unknown
+
+        Time complexity: O(k * d log d) expected for k members with at most d connections,
+        plus O(k * V / w) to build the membership bitmap. O(k * V / w) with use_triangles,
+        after triangle_counts.
         """
-        # Check all pairs are mutual friends and no external connections
-        current = cluster.head
-        while current is not None:
-            username = current.item
-            user_index = self._get_user_index(username)
-            
-            # Check all connections of this user
-            for friend_username in self.connections[user_index]:
-                # Check if friend is in the cluster
-                friend_in_cluster = False
-                cluster_current = cluster.head
-                while cluster_current is not None:
-                    if cluster_current.item == friend_username:
-                        friend_in_cluster = True
-                        break
-                    cluster_current = cluster_current.link
-                
-                # Friend should be in the cluster
-                if not friend_in_cluster:
+        # Membership bitmap over user indices
+        members = 0
+        size = 0
+        for username in cluster:
+            members |= 1 << self._require_user_index(username)
+            size += 1
+
+        if use_triangles and size > 0:
+            offsets, targets = self._mutual_rows()
+            triangles = self.triangle_counts()
+            first = -1
+            for username in cluster:
+                user_index = self._get_user_index(username)
+                if first < 0:
+                    first = user_index
+                if self._unreciprocated_out[user_index] != 0 or offsets[user_index + 1] - offsets[user_index] != size - 1:
+                    return False
+            for k in range(offsets[first], offsets[first + 1]):
+                if (members >> targets[k]) & 1 == 0:
                     return False
-                    
-                # Should be mutual friends
-                if not self.mutual_friends(username, friend_username):
+            return triangles[first] == (size - 1) * (size - 2) // 2
+
+        for username in cluster:
+            user_index = self._get_user_index(username)
+            following = self._graph.successors(user_index)
+            for k in range(len(following)):
+                friend_index = following[k]
+                # Friend should be in the cluster and follow back
+                if (members >> friend_index) & 1 == 0 or not self._follows(friend_index, user_index):
                     return False
-            
-            current = current.link
-        
-        return True
\ No newline at end of file
+            # Mutual friends with every other member
+            if len(following) != size - 1:
+                return False
+
+        return True
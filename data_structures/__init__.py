@@ -1,7 +1,15 @@
+from .adjacency_list_graph import AdjacencyListGraph
+from .array_min_heap import ArrayMinHeap
 from .array_set import ArraySet
 from .array_sorted_list import ArraySortedList
 from .array_stack import ArrayStack
 from .bit_vector_set import BitVectorSet
 from .circular_queue import CircularQueue
+from .csr_graph import CSRGraph
+from .disjoint_set import DisjointSet
+from .hash_table import LinearProbeTable
 from .linked_list import LinkedList
+from .min_hash import MinHashIndex
+from .order_statistic_tree import OrderStatisticTree
 from .referential_array import ArrayR
+from .varint_graph import VarintGraph
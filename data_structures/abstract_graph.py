@@ -0,0 +1,148 @@
+from abc import ABC, abstractmethod
+from array import array
+from typing import Sequence
+
+from data_structures.referential_array import ArrayR
+
+
+class Graph(ABC):
+    """ Directed graph ADT over integer vertices 0..n-1.
+
+    Neighbour sequences returned by successors() and predecessors() are in
+    ascending vertex order, support len(), indexing and iteration, and must
+    not be modified by the caller.
+    """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """ Returns the number of vertices. """
+        pass
+
+    @abstractmethod
+    def number_of_edges(self) -> int:
+        """ Returns the number of edges. """
+        pass
+
+    @abstractmethod
+    def out_degree(self, u: int) -> int:
+        """ Returns the number of edges leaving u. """
+        pass
+
+    @abstractmethod
+    def in_degree(self, u: int) -> int:
+        """ Returns the number of edges entering u. """
+        pass
+
+    @abstractmethod
+    def successors(self, u: int) -> Sequence[int]:
+        """ Returns the vertices v with an edge u -> v, in ascending order. """
+        pass
+
+    @abstractmethod
+    def predecessors(self, u: int) -> Sequence[int]:
+        """ Returns the vertices v with an edge v -> u, in ascending order. """
+        pass
+
+    @abstractmethod
+    def has_edge(self, u: int, v: int) -> bool:
+        """ True if there is an edge u -> v. """
+        pass
+
+    def mutual(self, u: int) -> array:
+        """ Returns the vertices that u has edges to and from, in ascending
+        order, by merging its successor and predecessor rows. :complexity: O(d) """
+        following = self.successors(u)
+        followers = self.predecessors(u)
+        row = array('i')
+        a = b = 0
+        while a < len(following) and b < len(followers):
+            if following[a] < followers[b]:
+                a += 1
+            elif following[a] > followers[b]:
+                b += 1
+            else:
+                row.append(following[a])
+                a += 1
+                b += 1
+        return row
+
+    def strongly_connected_components(self) -> tuple:
+        """
+        Splits the vertices into strongly connected components with an
+        iterative Tarjan search: the depth-first call stack is a pair of typed
+        arrays (vertex, next successor position), so deep graphs cannot hit the
+        recursion limit and no per-vertex Python objects are made.
+
+        Components are numbered in reverse topological order: every edge between
+        two components goes from the higher number to the lower one.
+        :returns: (component, sizes) typed arrays: component[u] is the number of
+            the component of u, and sizes[c] the number of vertices in component c
+        :complexity: O(V + E)
+        """
+        n = len(self)
+        order = array('i', (-1,)) * n      # discovery order, -1 if unvisited
+        low = array('i', (0,)) * n         # smallest order reachable through the DFS subtree
+        on_stack = bytearray(n)
+        component = array('i', (-1,)) * n
+        sizes = array('i')
+        stack = array('i')                 # visited vertices not yet in a component
+        call_vertex = array('i')
+        call_position = array('q')
+        call_rows = ArrayR(n)              # successors of call_vertex[d], fetched once
+        visited = 0
+
+        for root in range(n):
+            if order[root] >= 0:
+                continue
+            order[root] = low[root] = visited
+            visited += 1
+            stack.append(root)
+            on_stack[root] = 1
+            call_vertex.append(root)
+            call_position.append(0)
+            call_rows[0] = self.successors(root)
+
+            while len(call_vertex) > 0:
+                v = call_vertex[-1]
+                k = call_position[-1]
+                successors = call_rows[len(call_vertex) - 1]
+                if k < len(successors):
+                    call_position[-1] = k + 1
+                    w = successors[k]
+                    if order[w] < 0:
+                        # descend into w
+                        order[w] = low[w] = visited
+                        visited += 1
+                        stack.append(w)
+                        on_stack[w] = 1
+                        call_vertex.append(w)
+                        call_position.append(0)
+                        call_rows[len(call_vertex) - 1] = self.successors(w)
+                    elif on_stack[w] and order[w] < low[v]:
+                        low[v] = order[w]
+                    continue
+
+                # v is finished: return to its parent, and pop v's component if v is its root
+                call_vertex.pop()
+                call_position.pop()
+                call_rows[len(call_vertex)] = None
+                if len(call_vertex) > 0 and low[v] < low[call_vertex[-1]]:
+                    low[call_vertex[-1]] = low[v]
+                if low[v] == order[v]:
+                    number = len(sizes)
+                    size = 0
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = 0
+                        component[w] = number
+                        size += 1
+                        if w == v:
+                            break
+                    sizes.append(size)
+        return component, sizes
+
+    def __str__(self) -> str:
+        return f"{type(self).__name__}(vertices={len(self)}, edges={self.number_of_edges()})"
+
+    def __repr__(self) -> str:
+        return str(self)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from data_structures.abstract_graph import Graph
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.referential_array import ArrayR
+
+
+class AdjacencyListGraph(Graph):
+    """ Mutable directed graph storing both edge directions as sorted lists.
+
+    Every vertex keeps an ArraySortedList of its successors and one of its
+    predecessors, so edge lookups are binary searches and both directions
+    can be walked in ascending order.
+
+    Attributes:
+        vertices (int): number of vertices
+        edges (int): number of edges
+        out_rows/in_rows (ArrayR[ArraySortedList[int]]): neighbour lists,
+            with spare capacity for vertices added later
+    """
+
+    def __init__(self, n: int = 0) -> None:
+        """
+        Creates a graph with n vertices and no edges.
+        :complexity: O(n)
+        """
+        if n < 0:
+            raise ValueError("Number of vertices cannot be negative.")
+        self.__vertices = 0
+        self.__edges = 0
+        self.__out_rows = ArrayR(max(1, n))
+        self.__in_rows = ArrayR(max(1, n))
+        for _ in range(n):
+            self.add_vertex()
+
+    @classmethod
+    def from_successor_rows(cls, rows: ArrayR[ArrayR[int]]) -> AdjacencyListGraph:
+        """
+        Builds a graph where rows[u] holds the successors of u in any order.
+        Repeated entries in a row are stored once.
+
+        Both directions are filled by walking the other one in ascending
+        order, so every insertion lands at the end of its sorted list.
+        :complexity: O(V + E log d) where d is the largest degree
+        """
+        n = len(rows)
+        graph = cls(n)
+        for u in range(n):
+            row = rows[u]
+            for k in range(len(row)):
+                v = row[k]
+                if not 0 <= v < n:
+                    raise IndexError(f"Vertex {v} out of range.")
+                in_row = graph.__in_rows[v]
+                if len(in_row) == 0 or in_row[-1] != u:
+                    in_row.add(u)
+        for v in range(n):
+            in_row = graph.__in_rows[v]
+            for k in range(len(in_row)):
+                graph.__out_rows[in_row[k]].add(v)
+            graph.__edges += len(in_row)
+        return graph
+
+    def __len__(self) -> int:
+        """ Returns the number of vertices. """
+        return self.__vertices
+
+    def number_of_edges(self) -> int:
+        """ Returns the number of edges. """
+        return self.__edges
+
+    def add_vertex(self) -> int:
+        """
+        Adds a vertex with no edges.
+        :returns: the new vertex
+        :complexity: O(1) amortised; O(V) when the row arrays are resized.
+        """
+        if self.__vertices == len(self.__out_rows):
+            self.__out_rows = self.__resized(self.__out_rows)
+            self.__in_rows = self.__resized(self.__in_rows)
+        u = self.__vertices
+        self.__out_rows[u] = ArraySortedList()
+        self.__in_rows[u] = ArraySortedList()
+        self.__vertices += 1
+        return u
+
+    def __resized(self, rows: ArrayR) -> ArrayR:
+        bigger = ArrayR(2 * len(rows))
+        for i in range(self.__vertices):
+            bigger[i] = rows[i]
+        return bigger
+
+    def __check_vertex(self, u: int) -> None:
+        if not 0 <= u < self.__vertices:
+            raise IndexError(f"Vertex {u} out of range.")
+
+    def out_degree(self, u: int) -> int:
+        """ Returns the number of edges leaving u. """
+        self.__check_vertex(u)
+        return len(self.__out_rows[u])
+
+    def in_degree(self, u: int) -> int:
+        """ Returns the number of edges entering u. """
+        self.__check_vertex(u)
+        return len(self.__in_rows[u])
+
+    def successors(self, u: int) -> ArraySortedList[int]:
+        """ Returns the successors of u in ascending order. :complexity: O(1) """
+        self.__check_vertex(u)
+        return self.__out_rows[u]
+
+    def predecessors(self, u: int) -> ArraySortedList[int]:
+        """ Returns the predecessors of u in ascending order. :complexity: O(1) """
+        self.__check_vertex(u)
+        return self.__in_rows[u]
+
+    def has_edge(self, u: int, v: int) -> bool:
+        """ True if there is an edge u -> v. :complexity: O(log d) """
+        self.__check_vertex(u)
+        return v in self.__out_rows[u]
+
+    def add_edge(self, u: int, v: int) -> bool:
+        """
+        Adds the edge u -> v.
+        :returns: True if the edge was added, False if it already existed.
+        :complexity: O(d) for shifting inside the sorted lists of u and v.
+        """
+        self.__check_vertex(u)
+        self.__check_vertex(v)
+        if v in self.__out_rows[u]:
+            return False
+        self.__out_rows[u].add(v)
+        self.__in_rows[v].add(u)
+        self.__edges += 1
+        return True
+
+    def remove_edge(self, u: int, v: int) -> bool:
+        """
+        Removes the edge u -> v.
+        :returns: True if the edge was removed, False if there was no such edge.
+        :complexity: O(d) for shifting inside the sorted lists of u and v.
+        """
+        self.__check_vertex(u)
+        self.__check_vertex(v)
+        if v not in self.__out_rows[u]:
+            return False
+        self.__out_rows[u].remove(v)
+        self.__in_rows[v].remove(u)
+        self.__edges -= 1
+        return True
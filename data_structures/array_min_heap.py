@@ -0,0 +1,110 @@
+from data_structures.referential_array import ArrayR, T
+
+
+class ArrayMinHeap:
+    """ Bounded binary min-heap stored in an array.
+
+    The children of position i are 2i + 1 and 2i + 2, and no element is
+    smaller than its parent, so the smallest element is at position 0.
+    Elements are compared with <; use tuples to order by a key. With
+    replace() it keeps the largest k of a stream in O(log k) per element.
+
+    Attributes:
+         length (int): number of elements in the heap
+         array (ArrayR[T]): array storing the elements of the heap
+    """
+
+    def __init__(self, max_capacity: int) -> None:
+        """
+        :param max_capacity: maximum number of elements in the heap
+        :complexity: O(max_capacity) due to the creation of the array
+        """
+        if max_capacity <= 0:
+            raise ValueError("Capacity should be larger than 0.")
+        self.__array = ArrayR(max_capacity)
+        self.__length = 0
+
+    def __len__(self) -> int:
+        """ Returns the number of items in the heap. """
+        return self.__length
+
+    def is_empty(self) -> bool:
+        """ True if the heap holds no element. """
+        return len(self) == 0
+
+    def is_full(self) -> bool:
+        """ True if the heap is full and no element can be pushed. """
+        return len(self) == len(self.__array)
+
+    def clear(self) -> None:
+        self.__length = 0
+
+    def push(self, item: T) -> None:
+        """ Adds an element to the heap.
+        :raises Exception: if the heap is full
+        :complexity: O(log n)
+        """
+        if self.is_full():
+            raise Exception("Heap is full")
+        self.__array[self.__length] = item
+        self.__length += 1
+        self.__rise(self.__length - 1)
+
+    def peek(self) -> T:
+        """ Returns the smallest element without removing it.
+        :raises Exception: if the heap is empty
+        :complexity: O(1)
+        """
+        if self.is_empty():
+            raise Exception("Heap is empty")
+        return self.__array[0]
+
+    def pop(self) -> T:
+        """ Removes and returns the smallest element.
+        :raises Exception: if the heap is empty
+        :complexity: O(log n)
+        """
+        if self.is_empty():
+            raise Exception("Heap is empty")
+        smallest = self.__array[0]
+        self.__length -= 1
+        if self.__length > 0:
+            self.__array[0] = self.__array[self.__length]
+            self.__sink(0)
+        return smallest
+
+    def replace(self, item: T) -> T:
+        """ Removes the smallest element and adds item, in a single sift.
+        :returns: the removed element
+        :raises Exception: if the heap is empty
+        :complexity: O(log n)
+        """
+        smallest = self.peek()
+        self.__array[0] = item
+        self.__sink(0)
+        return smallest
+
+    def __rise(self, k: int) -> None:
+        item = self.__array[k]
+        while k > 0 and item < self.__array[(k - 1) // 2]:
+            self.__array[k] = self.__array[(k - 1) // 2]
+            k = (k - 1) // 2
+        self.__array[k] = item
+
+    def __sink(self, k: int) -> None:
+        item = self.__array[k]
+        while 2 * k + 1 < self.__length:
+            child = 2 * k + 1
+            if child + 1 < self.__length and self.__array[child + 1] < self.__array[child]:
+                child += 1
+            if not self.__array[child] < item:
+                break
+            self.__array[k] = self.__array[child]
+            k = child
+        self.__array[k] = item
+
+    def __str__(self) -> str:
+        return f"ArrayMinHeap(size={len(self)}, capacity={len(self.__array)})"
+
+    def __repr__(self) -> str:
+        return str(self)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+
+from data_structures.abstract_graph import Graph
+
+
+class CSRGraph(Graph):
+    """ Immutable directed graph in compressed sparse row (CSR) form.
+
+    The successors of u are targets[offsets[u]:offsets[u + 1]], sorted
+    ascending; the predecessors are stored the same way in a second pair
+    of arrays. Vertices are 32-bit signed integers and offsets 64-bit, so an
+    edge costs 8 bytes counting both directions.
+
+    Any buffer of the right item type works as storage (array.array,
+    memoryview over an mmap, ...); neighbour sequences are zero-copy
+    memoryview slices of it.
+
+    Attributes:
+        out_offsets/out_targets: successor rows
+        in_offsets/in_sources: predecessor rows
+    """
+
+    VERTEX_TYPECODE = 'i'
+    OFFSET_TYPECODE = 'q'
+
+    def __init__(self, out_offsets, out_targets, in_offsets, in_sources) -> None:
+        """
+        Wraps existing CSR buffers without copying them.
+        :pre: both offset buffers have n + 1 entries and rows are sorted ascending
+        :complexity: O(1)
+        """
+        if len(out_offsets) != len(in_offsets) or len(out_offsets) == 0:
+            raise ValueError("Offset arrays must both have n + 1 entries.")
+        self.__out_offsets = memoryview(out_offsets)
+        self.__out_targets = memoryview(out_targets)
+        self.__in_offsets = memoryview(in_offsets)
+        self.__in_sources = memoryview(in_sources)
+
+    @classmethod
+    def from_successor_rows(cls, rows) -> CSRGraph:
+        """
+        Builds a graph where rows[u] holds the successors of u in any order.
+        Repeated entries in a row are stored once.
+
+        The predecessor rows are filled by walking u in ascending order, which
+        leaves them sorted; the successor rows are then filled from those in
+        the same way, so no comparison sort is needed.
+        :complexity: O(V + E)
+        """
+        n = len(rows)
+        in_offsets = array(cls.OFFSET_TYPECODE, bytes(8 * (n + 1)))
+        for u in range(n):
+            row = rows[u]
+            for k in range(len(row)):
+                v = row[k]
+                if not 0 <= v < n:
+                    raise IndexError(f"Vertex {v} out of range.")
+                in_offsets[v + 1] += 1
+        for v in range(n):
+            in_offsets[v + 1] += in_offsets[v]
+
+        in_sources = array(cls.VERTEX_TYPECODE, bytes(4 * in_offsets[n]))
+        cursor = array(cls.OFFSET_TYPECODE, in_offsets)
+        for u in range(n):
+            row = rows[u]
+            for k in range(len(row)):
+                v = row[k]
+                in_sources[cursor[v]] = u
+                cursor[v] += 1
+
+        # Drop repeated edges: they sit next to each other in the sorted rows
+        write = 0
+        start = 0
+        for v in range(n):
+            end = in_offsets[v + 1]
+            for k in range(start, end):
+                if k == start or in_sources[k] != in_sources[k - 1]:
+                    in_sources[write] = in_sources[k]
+                    write += 1
+            start = end
+            in_offsets[v + 1] = write
+        del in_sources[write:]
+
+        return cls.__from_predecessor_rows(n, in_offsets, in_sources)
+
+    @classmethod
+    def from_edges(cls, n: int, sources, targets, consume: bool = False) -> CSRGraph:
+        """
+        Builds a graph on n vertices with the edges sources[k] -> targets[k].
+        Repeated edges are stored once.
+
+        The targets are bucketed by source, then the sources by target while
+        walking the sources in ascending order, which leaves the predecessor
+        rows sorted with repeats next to each other. Besides the edge arrays
+        this needs 8 bytes per edge at any time, as much as the graph itself.
+        With consume, sources and targets (arrays) are emptied as soon as they
+        are bucketed, so their memory is released before the rest is built.
+        :complexity: O(V + E)
+        """
+        if len(sources) != len(targets):
+            raise ValueError("Need as many sources as targets.")
+        m = len(sources)
+        out_offsets = cls.__row_offsets(n, sources)
+        bucketed = array(cls.VERTEX_TYPECODE, bytes(4 * m))
+        cursor = array(cls.OFFSET_TYPECODE, out_offsets)
+        for k in range(m):
+            u = sources[k]
+            bucketed[cursor[u]] = targets[k]
+            cursor[u] += 1
+        if consume:
+            del sources[:]
+            del targets[:]
+
+        in_offsets = cls.__row_offsets(n, bucketed)
+        in_sources = array(cls.VERTEX_TYPECODE, bytes(4 * m))
+        cursor = array(cls.OFFSET_TYPECODE, in_offsets)
+        for u in range(n):
+            for k in range(out_offsets[u], out_offsets[u + 1]):
+                v = bucketed[k]
+                in_sources[cursor[v]] = u
+                cursor[v] += 1
+        del bucketed, cursor
+
+        # Drop repeats in the predecessor rows, compacting them in place
+        write = 0
+        for v in range(n):
+            start = write
+            for k in range(in_offsets[v], in_offsets[v + 1]):
+                u = in_sources[k]
+                if write == start or in_sources[write - 1] != u:
+                    in_sources[write] = u
+                    write += 1
+            in_offsets[v] = start
+        in_offsets[n] = write
+        del in_sources[write:]
+        return cls.__from_predecessor_rows(n, in_offsets, in_sources)
+
+    @classmethod
+    def __row_offsets(cls, n: int, keys) -> array:
+        """
+        Start of the row of every key (n + 1 entries) when keys, all in 0..n-1,
+        are bucketed.
+        :raises IndexError: if a key is out of range
+        :complexity: O(n + len(keys))
+        """
+        offsets = array(cls.OFFSET_TYPECODE, bytes(8 * (n + 1)))
+        for k in range(len(keys)):
+            key = keys[k]
+            if not 0 <= key < n:
+                raise IndexError(f"Vertex {key} out of range.")
+            offsets[key + 1] += 1
+        for v in range(n):
+            offsets[v + 1] += offsets[v]
+        return offsets
+
+    @classmethod
+    def __from_predecessor_rows(cls, n: int, in_offsets, in_sources) -> CSRGraph:
+        """
+        Builds the graph from sorted predecessor rows by counting sort into
+        successor rows.
+        :complexity: O(V + E)
+        """
+        out_offsets = array(cls.OFFSET_TYPECODE, bytes(8 * (n + 1)))
+        for k in range(len(in_sources)):
+            out_offsets[in_sources[k] + 1] += 1
+        for u in range(n):
+            out_offsets[u + 1] += out_offsets[u]
+        out_targets = array(cls.VERTEX_TYPECODE, bytes(4 * len(in_sources)))
+        cursor = array(cls.OFFSET_TYPECODE, out_offsets)
+        for v in range(n):
+            for k in range(in_offsets[v], in_offsets[v + 1]):
+                u = in_sources[k]
+                out_targets[cursor[u]] = v
+                cursor[u] += 1
+        return cls(out_offsets, out_targets, in_offsets, in_sources)
+
+    def __len__(self) -> int:
+        """ Returns the number of vertices. """
+        return len(self.__out_offsets) - 1
+
+    def number_of_edges(self) -> int:
+        """ Returns the number of edges. """
+        return len(self.__out_targets)
+
+    def __check_vertex(self, u: int) -> None:
+        if not 0 <= u < len(self):
+            raise IndexError(f"Vertex {u} out of range.")
+
+    def out_degree(self, u: int) -> int:
+        """ Returns the number of edges leaving u. :complexity: O(1) """
+        self.__check_vertex(u)
+        return self.__out_offsets[u + 1] - self.__out_offsets[u]
+
+    def in_degree(self, u: int) -> int:
+        """ Returns the number of edges entering u. :complexity: O(1) """
+        self.__check_vertex(u)
+        return self.__in_offsets[u + 1] - self.__in_offsets[u]
+
+    def successors(self, u: int) -> memoryview:
+        """ Returns the successors of u in ascending order. :complexity: O(1) """
+        self.__check_vertex(u)
+        return self.__out_targets[self.__out_offsets[u]:self.__out_offsets[u + 1]]
+
+    def predecessors(self, u: int) -> memoryview:
+        """ Returns the predecessors of u in ascending order. :complexity: O(1) """
+        self.__check_vertex(u)
+        return self.__in_sources[self.__in_offsets[u]:self.__in_offsets[u + 1]]
+
+    def has_edge(self, u: int, v: int) -> bool:
+        """ True if there is an edge u -> v. :complexity: O(log d) """
+        self.__check_vertex(u)
+        start = self.__out_offsets[u]
+        end = self.__out_offsets[u + 1]
+        k = bisect_left(self.__out_targets, v, start, end)
+        return k < end and self.__out_targets[k] == v
+
+    def buffers(self) -> tuple:
+        """ Returns (out_offsets, out_targets, in_offsets, in_sources) as memoryviews. """
+        return self.__out_offsets, self.__out_targets, self.__in_offsets, self.__in_sources
+
+    def nbytes(self) -> int:
+        """ Returns the size of the four CSR buffers in bytes. """
+        return (self.__out_offsets.nbytes + self.__out_targets.nbytes
+                + self.__in_offsets.nbytes + self.__in_sources.nbytes)
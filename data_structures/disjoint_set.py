@@ -0,0 +1,81 @@
+from data_structures.referential_array import ArrayR
+
+
+class DisjointSet:
+    """
+    Disjoint-set (union-find) over the integers 0..n-1.
+
+    Uses union by size and path halving, so any sequence of m operations
+    costs O(m * alpha(n)), which is effectively O(m).
+
+    Attributes:
+        parent (ArrayR[int]): parent of each element; roots are their own parent
+        size (ArrayR[int]): number of elements under each root
+        count (int): number of disjoint sets
+    """
+
+    def __init__(self, n: int) -> None:
+        """
+        Creates n singleton sets {0}, {1}, ..., {n-1}.
+        :complexity: O(n)
+        """
+        if n < 0:
+            raise ValueError("Number of elements cannot be negative.")
+        self.__parent = ArrayR(n)
+        self.__size = ArrayR(n)
+        for i in range(n):
+            self.__parent[i] = i
+            self.__size[i] = 1
+        self.__count = n
+
+    def __len__(self) -> int:
+        """ Returns the number of elements (not sets). """
+        return len(self.__parent)
+
+    @property
+    def count(self) -> int:
+        """ Returns the number of disjoint sets. """
+        return self.__count
+
+    def find(self, x: int) -> int:
+        """
+        Returns the root of the set containing x.
+        :complexity: O(alpha(n)) amortised
+        """
+        parent = self.__parent
+        while parent[x] != x:
+            # path halving: point x at its grandparent while walking up
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, x: int, y: int) -> bool:
+        """
+        Merges the sets containing x and y.
+        :returns: True if they were in different sets, False otherwise.
+        :complexity: O(alpha(n)) amortised
+        """
+        root_x = self.find(x)
+        root_y = self.find(y)
+        if root_x == root_y:
+            return False
+        if self.__size[root_x] < self.__size[root_y]:
+            root_x, root_y = root_y, root_x
+        self.__parent[root_y] = root_x
+        self.__size[root_x] += self.__size[root_y]
+        self.__count -= 1
+        return True
+
+    def connected(self, x: int, y: int) -> bool:
+        """ True if x and y are in the same set. """
+        return self.find(x) == self.find(y)
+
+    def size_of(self, x: int) -> int:
+        """ Returns the number of elements in the set containing x. """
+        return self.__size[self.find(x)]
+
+    def __str__(self) -> str:
+        return f"DisjointSet(elements={len(self)}, sets={self.__count})"
+
+    def __repr__(self) -> str:
+        return str(self)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from typing import Generic, Iterator, TypeVar
+
+from data_structures.referential_array import ArrayR
+
+K = TypeVar('K')
+V = TypeVar('V')
+
+
+class LinearProbeTable(Generic[K, V]):
+    """
+    Open-addressing hash table using linear probing.
+
+    Keys and values are stored in two parallel arrays whose capacity is
+    always a power of two, so the home slot of a key is found with a mask
+    instead of a modulo. Deleted slots are marked with a tombstone so that
+    probe chains running through them are not broken.
+
+    Attributes:
+        length (int): number of keys currently stored
+        keys/values (ArrayR): parallel slot arrays
+    """
+
+    MIN_CAPACITY = 8
+
+    # Marks a slot whose key was deleted; never equal to a user key.
+    _TOMBSTONE = object()
+
+    def __init__(self, expected_size: int = 0) -> None:
+        """
+        Creates an empty table able to hold expected_size keys without resizing.
+        :complexity: O(expected_size) to allocate the slot arrays
+        """
+        if expected_size < 0:
+            raise ValueError("Expected size cannot be negative.")
+        capacity = LinearProbeTable.MIN_CAPACITY
+        # keep the load factor at or below 1/2
+        while capacity < 2 * expected_size:
+            capacity *= 2
+        self.__setup(capacity)
+
+    def __setup(self, capacity: int) -> None:
+        self.__keys = ArrayR(capacity)
+        self.__values = ArrayR(capacity)
+        self.__mask = capacity - 1
+        self.__length = 0
+        self.__used = 0  # live keys plus tombstones
+
+    def __len__(self) -> int:
+        """ Returns the number of keys in the table. """
+        return self.__length
+
+    def is_empty(self) -> bool:
+        """ True if the table holds no keys. """
+        return self.__length == 0
+
+    def clear(self) -> None:
+        """ Removes every key, keeping the current capacity.
+        :complexity: O(capacity)
+        """
+        self.__setup(len(self.__keys))
+
+    def __probe(self, key: K) -> int:
+        """
+        Returns the slot holding key, or -1 if key is absent.
+        :complexity: O(1) expected, O(capacity) worst case when every key collides
+        """
+        keys = self.__keys
+        mask = self.__mask
+        position = hash(key) & mask
+        while True:
+            current = keys[position]
+            if current is None:
+                return -1
+            if current is not LinearProbeTable._TOMBSTONE and current == key:
+                return position
+            position = (position + 1) & mask
+
+    def __contains__(self, key: K) -> bool:
+        """ True if key is in the table.
+        :complexity: See __probe
+        """
+        return self.__probe(key) >= 0
+
+    def __getitem__(self, key: K) -> V:
+        """ Returns the value associated with key.
+        :raises KeyError: if the key is not in the table.
+        :complexity: See __probe
+        """
+        position = self.__probe(key)
+        if position < 0:
+            raise KeyError(key)
+        return self.__values[position]
+
+    def get(self, key: K, default: V = None) -> V:
+        """ Returns the value associated with key, or default if it is absent.
+        :complexity: See __probe
+        """
+        position = self.__probe(key)
+        if position < 0:
+            return default
+        return self.__values[position]
+
+    def __setitem__(self, key: K, value: V) -> None:
+        """ Associates value with key, replacing any previous value.
+        :complexity: O(1) amortised expected; O(capacity) when a resize is triggered.
+        """
+        if key is None:
+            raise KeyError("None cannot be used as a key.")
+        keys = self.__keys
+        mask = self.__mask
+        position = hash(key) & mask
+        first_free = -1
+        while True:
+            current = keys[position]
+            if current is None:
+                break
+            if current is LinearProbeTable._TOMBSTONE:
+                if first_free < 0:
+                    first_free = position
+            elif current == key:
+                self.__values[position] = value
+                return
+            position = (position + 1) & mask
+
+        if first_free >= 0:
+            # reuse the tombstone; the count of used slots does not change
+            position = first_free
+        else:
+            self.__used += 1
+        keys[position] = key
+        self.__values[position] = value
+        self.__length += 1
+
+        if 2 * self.__used > len(keys):
+            self.__rehash()
+
+    def __delitem__(self, key: K) -> None:
+        """ Removes key from the table.
+        :raises KeyError: if the key is not in the table.
+        :complexity: See __probe
+        """
+        position = self.__probe(key)
+        if position < 0:
+            raise KeyError(key)
+        self.__keys[position] = LinearProbeTable._TOMBSTONE
+        self.__values[position] = None
+        self.__length -= 1
+
+    def __rehash(self) -> None:
+        """
+        Moves every live key into fresh arrays, dropping tombstones.
+        Grows only when live keys alone would keep the table over half full.
+        :complexity: O(capacity)
+        """
+        old_keys = self.__keys
+        old_values = self.__values
+        capacity = len(old_keys)
+        if 4 * self.__length > capacity:
+            capacity *= 2
+        self.__setup(capacity)
+        keys = self.__keys
+        values = self.__values
+        mask = self.__mask
+        for i in range(len(old_keys)):
+            key = old_keys[i]
+            if key is None or key is LinearProbeTable._TOMBSTONE:
+                continue
+            position = hash(key) & mask
+            while keys[position] is not None:
+                position = (position + 1) & mask
+            keys[position] = key
+            values[position] = old_values[i]
+            self.__length += 1
+        self.__used = self.__length
+
+    def keys(self) -> Iterator[K]:
+        """ Iterates over the keys in slot order. """
+        for i in range(len(self.__keys)):
+            key = self.__keys[i]
+            if key is not None and key is not LinearProbeTable._TOMBSTONE:
+                yield key
+
+    def values(self) -> Iterator[V]:
+        """ Iterates over the values in slot order. """
+        for i in range(len(self.__keys)):
+            key = self.__keys[i]
+            if key is not None and key is not LinearProbeTable._TOMBSTONE:
+                yield self.__values[i]
+
+    def items(self) -> Iterator[tuple[K, V]]:
+        """ Iterates over (key, value) pairs in slot order. """
+        for i in range(len(self.__keys)):
+            key = self.__keys[i]
+            if key is not None and key is not LinearProbeTable._TOMBSTONE:
+                yield key, self.__values[i]
+
+    def __iter__(self) -> Iterator[K]:
+        return self.keys()
+
+    def __str__(self) -> str:
+        return "{" + ", ".join(f"{key!r}: {value!r}" for key, value in self.items()) + "}"
+
+    def __repr__(self) -> str:
+        return str(self)
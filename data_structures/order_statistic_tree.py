@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from typing import Generic
+
+from data_structures.node import BinaryNode, K
+
+
+class _CountNode(BinaryNode[K, int]):
+    """ BinaryNode of a key and its multiplicity (item). _size counts the
+    nodes of the subtree, which the balance is kept on, and _total the keys
+    in it with repeats, which ranks are taken over. """
+
+    def __init__(self, key: K, count: int) -> None:
+        super().__init__(count, key, 1)
+        self.key = key  # BinaryNode takes the item for a falsy key
+        self._total = count
+
+
+class OrderStatisticTree(Generic[K]):
+    """ Sorted multiset of comparable keys with selection by rank.
+
+    A weight-balanced binary search tree with one node per distinct key,
+    holding how many copies of the key there are, so adding or removing any
+    number of copies of a key is a single O(log n) update. Every node also
+    keeps the number of nodes and the number of keys (repeats counted) in its
+    subtree. Key counts give the k-th smallest key by a single descent. Node
+    counts keep the tree balanced: after an insertion or deletion every node
+    on the path is checked and, when one side weighs more than DELTA times
+    the other (a subtree of s nodes weighing s + 1), rotated once or twice
+    depending on RATIO. With (DELTA, RATIO) = (3, 2) the height stays
+    O(log n) for n distinct keys under any mix of updates (Hirai & Yamamoto,
+    "Balancing weight-balanced trees", 2011).
+
+    Nothing is assumed about the keys beyond <, so it gives a streaming
+    median or percentile over an unbounded domain in O(log n) per update.
+    """
+
+    DELTA = 3
+    RATIO = 2
+
+    def __init__(self) -> None:
+        self.__root: _CountNode[K] | None = None
+
+    def __len__(self) -> int:
+        """ Returns the number of keys, counting repeats. """
+        return self.__total(self.__root)
+
+    def is_empty(self) -> bool:
+        return self.__root is None
+
+    def __contains__(self, key: K) -> bool:
+        """ True if key is in the tree. :complexity: O(log n) """
+        return self.count(key) > 0
+
+    def count(self, key: K) -> int:
+        """ Returns the number of copies of key. :complexity: O(log n) """
+        node = self.__root
+        while node is not None:
+            if key < node.key:
+                node = node._left
+            elif node.key < key:
+                node = node._right
+            else:
+                return node.item
+        return 0
+
+    def add(self, key: K, count: int = 1) -> None:
+        """ Adds count copies of key.
+        :raises ValueError: if count is not positive
+        :complexity: O(log n)
+        """
+        if count < 1:
+            raise ValueError("Count should be positive.")
+        self.__root = self.__insert(self.__root, key, count)
+
+    def remove(self, key: K, count: int = 1) -> None:
+        """ Removes count copies of key.
+        :raises ValueError: if count is not positive, or there are fewer than
+            count copies of key; the tree is then unchanged
+        :complexity: O(log n)
+        """
+        if count < 1:
+            raise ValueError("Count should be positive.")
+        self.__root = self.__delete(self.__root, key, count)
+
+    def select(self, k: int) -> K:
+        """ Returns the k-th smallest key (1-based), repeats counted.
+        :raises IndexError: if k is not in 1..len(self)
+        :complexity: O(log n)
+        """
+        if not 1 <= k <= len(self):
+            raise IndexError(f"Rank {k} out of range.")
+        node = self.__root
+        while True:
+            smaller = self.__total(node._left)
+            if k <= smaller:
+                node = node._left
+            elif k <= smaller + node.item:
+                return node.key
+            else:
+                k -= smaller + node.item
+                node = node._right
+
+    def rank(self, key: K) -> int:
+        """ Returns the number of keys smaller than key. :complexity: O(log n) """
+        smaller = 0
+        node = self.__root
+        while node is not None:
+            if node.key < key:
+                smaller += self.__total(node._left) + node.item
+                node = node._right
+            else:
+                node = node._left
+        return smaller
+
+    def median(self) -> float:
+        """ Returns the middle key, or the average of the two middle keys for
+        an even number of keys (0.0 when empty).
+        :complexity: O(log n)
+        """
+        n = len(self)
+        if n == 0:
+            return 0.0
+        if n % 2 == 1:
+            return float(self.select((n + 1) // 2))
+        return (self.select(n // 2) + self.select(n // 2 + 1)) / 2.0
+
+    @staticmethod
+    def __size(node: _CountNode | None) -> int:
+        return 0 if node is None else node._size
+
+    @staticmethod
+    def __total(node: _CountNode | None) -> int:
+        return 0 if node is None else node._total
+
+    def __insert(self, node: _CountNode | None, key: K, count: int) -> _CountNode:
+        if node is None:
+            return _CountNode(key, count)
+        if key < node.key:
+            node._left = self.__insert(node._left, key, count)
+        elif node.key < key:
+            node._right = self.__insert(node._right, key, count)
+        else:
+            node.item += count
+        return self.__balance(node)
+
+    def __delete(self, node: _CountNode | None, key: K, count: int) -> _CountNode | None:
+        if node is None:
+            raise ValueError(f"{key} not found")
+        if key < node.key:
+            node._left = self.__delete(node._left, key, count)
+        elif node.key < key:
+            node._right = self.__delete(node._right, key, count)
+        elif node.item < count:
+            raise ValueError(f"Only {node.item} copies of {key}")
+        elif node.item > count:
+            node.item -= count
+        elif node._left is None:
+            return node._right
+        elif node._right is None:
+            return node._left
+        else:
+            # replace node by the smallest node of its right subtree
+            successor = node._right
+            while successor._left is not None:
+                successor = successor._left
+            successor._right = self.__delete_min(node._right)
+            successor._left = node._left
+            node = successor
+        return self.__balance(node)
+
+    def __delete_min(self, node: _CountNode) -> _CountNode | None:
+        if node._left is None:
+            return node._right
+        node._left = self.__delete_min(node._left)
+        return self.__balance(node)
+
+    def __balance(self, node: _CountNode) -> _CountNode:
+        """ Restores the weight balance at node, whose subtrees are balanced and
+        changed by at most one node, and returns the new subtree root. """
+        left_weight = self.__size(node._left) + 1
+        right_weight = self.__size(node._right) + 1
+        if right_weight > self.DELTA * left_weight:
+            right = node._right
+            if self.__size(right._left) + 1 >= self.RATIO * (self.__size(right._right) + 1):
+                node._right = self.__rotate_right(right)
+            node = self.__rotate_left(node)
+        elif left_weight > self.DELTA * right_weight:
+            left = node._left
+            if self.__size(left._right) + 1 >= self.RATIO * (self.__size(left._left) + 1):
+                node._left = self.__rotate_left(left)
+            node = self.__rotate_right(node)
+        else:
+            self.__resize(node)
+        return node
+
+    def __resize(self, node: _CountNode) -> None:
+        node._size = self.__size(node._left) + self.__size(node._right) + 1
+        node._total = self.__total(node._left) + self.__total(node._right) + node.item
+
+    def __rotate_left(self, node: _CountNode) -> _CountNode:
+        right = node._right
+        node._right = right._left
+        right._left = node
+        self.__resize(node)
+        self.__resize(right)
+        return right
+
+    def __rotate_right(self, node: _CountNode) -> _CountNode:
+        left = node._left
+        node._left = left._right
+        left._right = node
+        self.__resize(node)
+        self.__resize(left)
+        return left
+
+    def __str__(self) -> str:
+        return f"OrderStatisticTree(size={len(self)})"
+
+    def __repr__(self) -> str:
+        return str(self)
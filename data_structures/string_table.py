@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from array import array
+from zlib import crc32
+
+
+class StringTable:
+    """ Read-only table of strings packed into flat buffers.
+
+    Position i holds the UTF-8 bytes blob[offsets[i]:offsets[i + 1]], or None
+    when present[i] is 0. A hashed directory maps each string back to its
+    position: an open-addressing table of positions (-1 for empty slots),
+    probed linearly from crc32(string) & (capacity - 1). The hash does not
+    depend on the process, so the buffers can be written to disk once and
+    mapped back in by any process without rebuilding anything.
+
+    Attributes:
+        offsets (int64 buffer, n + 1 entries): start of every string in blob
+        blob (bytes buffer): the concatenated strings
+        present (int8 buffer, n entries): 0 where a position holds None
+        directory (int32 buffer, a power of two entries): hashed positions
+    """
+
+    def __init__(self, offsets, blob, present, directory) -> None:
+        """
+        Wraps existing buffers without copying them.
+        :complexity: O(1)
+        """
+        self.__offsets = memoryview(offsets)
+        self.__blob = memoryview(blob)
+        self.__present = memoryview(present)
+        self.__directory = memoryview(directory)
+        self.__mask = len(self.__directory) - 1
+        if len(self.__directory) & self.__mask:
+            raise ValueError("Directory size must be a power of two.")
+
+    @classmethod
+    def build(cls, strings, n: int) -> StringTable:
+        """
+        Packs strings[0..n-1] (None allowed) into a new table.
+        :raises ValueError: if a string appears twice.
+        :complexity: O(n + total length of the strings)
+        """
+        offsets = array('q', bytes(8 * (n + 1)))
+        present = array('b', bytes(n))
+        blob = bytearray()
+        for i in range(n):
+            string = strings[i]
+            if string is not None:
+                blob += string.encode()
+                present[i] = 1
+            offsets[i + 1] = len(blob)
+
+        capacity = 8
+        while capacity < 2 * n:
+            capacity *= 2
+        directory = array('i', (-1,)) * capacity
+        table = cls(offsets, blob, present, directory)
+        for i in range(n):
+            if present[i]:
+                table.__insert(i)
+        return table
+
+    def __insert(self, position: int) -> None:
+        """ Adds position to the directory (only used while building). """
+        key = bytes(self.__blob[self.__offsets[position]:self.__offsets[position + 1]])
+        slot = crc32(key) & self.__mask
+        while self.__directory[slot] >= 0:
+            if self.__bytes_at(self.__directory[slot]) == key:
+                raise ValueError(f"Duplicate string {key.decode()!r}.")
+            slot = (slot + 1) & self.__mask
+        self.__directory[slot] = position
+
+    def __bytes_at(self, position: int) -> memoryview:
+        return self.__blob[self.__offsets[position]:self.__offsets[position + 1]]
+
+    def __len__(self) -> int:
+        """ Returns the number of positions, None entries included. """
+        return len(self.__present)
+
+    def __getitem__(self, position: int) -> str | None:
+        """ Returns the string at position, decoding it from the blob.
+        :complexity: O(length of the string)
+        """
+        if not 0 <= position < len(self):
+            raise IndexError('Out of bounds access in string table.')
+        if not self.__present[position]:
+            return None
+        return str(self.__bytes_at(position), 'utf-8')
+
+    def get(self, string: str, default: int = None) -> int:
+        """ Returns the position of string, or default if it is absent.
+        :complexity: O(length of the string) expected
+        """
+        key = string.encode()
+        slot = crc32(key) & self.__mask
+        while True:
+            position = self.__directory[slot]
+            if position < 0:
+                return default
+            if self.__bytes_at(position) == key:
+                return position
+            slot = (slot + 1) & self.__mask
+
+    def __contains__(self, string: str) -> bool:
+        return self.get(string, -1) >= 0
+
+    def buffers(self) -> tuple:
+        """ Returns (offsets, blob, present, directory) as memoryviews. """
+        return self.__offsets, self.__blob, self.__present, self.__directory
+
+    def __str__(self) -> str:
+        return f"StringTable(size={len(self)}, bytes={len(self.__blob)})"
+
+    def __repr__(self) -> str:
+        return str(self)
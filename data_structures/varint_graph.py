@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from array import array
+
+from data_structures.abstract_graph import Graph
+
+
+def _append_varint(value: int, out: bytearray) -> None:
+    """ Appends value >= 0 to out as a LEB128 varint: 7 bits per byte, low
+    bits first, with the high bit set on all but the last byte. """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _encode_row(row, out: bytearray) -> None:
+    """ Appends the ascending row to out: its length, then the gaps minus one
+    between consecutive entries (the first entry as itself), all as varints. """
+    _append_varint(len(row), out)
+    previous = -1
+    for k in range(len(row)):
+        _append_varint(row[k] - previous - 1, out)
+        previous = row[k]
+
+
+def _read_varint(data: memoryview, position: int) -> int:
+    """ The varint starting at data[position]. """
+    value = 0
+    shift = 0
+    while data[position] & 0x80:
+        value |= (data[position] & 0x7F) << shift
+        shift += 7
+        position += 1
+    return value | (data[position] << shift)
+
+
+def _decode(data: memoryview):
+    """ Yields the vertices of an encoded row in ascending order. """
+    previous = -1
+    value = 0
+    shift = 0
+    counted = False
+    for byte in data:
+        if byte & 0x80:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            continue
+        if counted:
+            previous += (value | (byte << shift)) + 1
+            yield previous
+        else:
+            counted = True
+        value = 0
+        shift = 0
+
+
+def _intersect(a, b) -> array:
+    """ The vertices in both ascending iterators a and b (of vertices >= 0), merged in one pass. """
+    common = array('i')
+    x = next(a, -1)
+    y = next(b, -1)
+    while x >= 0 and y >= 0:
+        if x < y:
+            x = next(a, -1)
+        elif x > y:
+            y = next(b, -1)
+        else:
+            common.append(x)
+            x = next(a, -1)
+            y = next(b, -1)
+    return common
+
+
+class VarintGraph(Graph):
+    """ Immutable directed graph with delta-varint compressed neighbour rows.
+
+    Every row is stored sorted as its length and then the gaps between
+    consecutive vertices in LEB128 varints, in one byte buffer per direction,
+    so an edge costs one byte whenever the gap is under 128, two under 16384
+    and so on, instead of the four of CSRGraph. Row offsets are 32-bit while
+    the buffers stay under 4 GiB, so a vertex costs about 10 bytes instead of
+    CSRGraph's 16. Gaps are small when followed users have close indices,
+    e.g. when users are numbered in the order a crawl found them.
+
+    Rows are only readable by decoding them from the start: successors()
+    and predecessors() build a fresh int array in O(d), has_edge() scans,
+    and iter_successors(), iter_predecessors() and mutual() work on the
+    encoded bytes without building rows.
+
+    Attributes:
+        out_offsets/out_bytes: successor rows
+        in_offsets/in_bytes: predecessor rows
+    """
+
+    def __init__(self, out_offsets, out_bytes, in_offsets, in_bytes) -> None:
+        """
+        Wraps existing buffers without copying them.
+        :pre: both offset buffers have n + 1 entries and the rows are encoded as by _encode_row
+        :complexity: O(1)
+        """
+        if len(out_offsets) != len(in_offsets) or len(out_offsets) == 0:
+            raise ValueError("Offset arrays must both have n + 1 entries.")
+        self.__out_offsets = memoryview(out_offsets)
+        self.__out_bytes = memoryview(out_bytes)
+        self.__in_offsets = memoryview(in_offsets)
+        self.__in_bytes = memoryview(in_bytes)
+        self.__edges = -1
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> VarintGraph:
+        """
+        Compresses any graph, e.g. a CSRGraph built with from_successor_rows.
+        :complexity: O(V + E)
+        """
+        n = len(graph)
+        out_offsets, out_bytes = cls.__encode(n, graph.successors)
+        in_offsets, in_bytes = cls.__encode(n, graph.predecessors)
+        return cls(out_offsets, out_bytes, in_offsets, in_bytes)
+
+    @staticmethod
+    def __encode(n: int, rows) -> tuple:
+        """ (offsets, bytes) of the n rows returned by rows(u). """
+        offsets = array('q', bytes(8 * (n + 1)))
+        data = bytearray()
+        for u in range(n):
+            _encode_row(rows(u), data)
+            offsets[u + 1] = len(data)
+        if len(data) < 1 << 32:
+            offsets = array('I', offsets)
+        return offsets, data
+
+    def __len__(self) -> int:
+        """ Returns the number of vertices. """
+        return len(self.__out_offsets) - 1
+
+    def number_of_edges(self) -> int:
+        """ Returns the number of edges. :complexity: O(V) the first time, O(1) afterwards """
+        if self.__edges < 0:
+            self.__edges = 0
+            for u in range(len(self)):
+                self.__edges += self.out_degree(u)
+        return self.__edges
+
+    def __check_vertex(self, u: int) -> None:
+        if not 0 <= u < len(self):
+            raise IndexError(f"Vertex {u} out of range.")
+
+    def out_degree(self, u: int) -> int:
+        """ Returns the number of edges leaving u. :complexity: O(1) """
+        self.__check_vertex(u)
+        return _read_varint(self.__out_bytes, self.__out_offsets[u])
+
+    def in_degree(self, u: int) -> int:
+        """ Returns the number of edges entering u. :complexity: O(1) """
+        self.__check_vertex(u)
+        return _read_varint(self.__in_bytes, self.__in_offsets[u])
+
+    def iter_successors(self, u: int):
+        """ Iterates over the successors of u in ascending order, decoding as it goes. """
+        self.__check_vertex(u)
+        return _decode(self.__out_bytes[self.__out_offsets[u]:self.__out_offsets[u + 1]])
+
+    def iter_predecessors(self, u: int):
+        """ Iterates over the predecessors of u in ascending order, decoding as it goes. """
+        self.__check_vertex(u)
+        return _decode(self.__in_bytes[self.__in_offsets[u]:self.__in_offsets[u + 1]])
+
+    def successors(self, u: int) -> array:
+        """ Returns the successors of u in ascending order. :complexity: O(d) """
+        return array('i', self.iter_successors(u))
+
+    def predecessors(self, u: int) -> array:
+        """ Returns the predecessors of u in ascending order. :complexity: O(d) """
+        return array('i', self.iter_predecessors(u))
+
+    def has_edge(self, u: int, v: int) -> bool:
+        """ True if there is an edge u -> v. :complexity: O(d), stopping at the first successor >= v """
+        for w in self.iter_successors(u):
+            if w >= v:
+                return w == v
+        return False
+
+    def mutual(self, u: int) -> array:
+        """ The vertices that u has edges to and from, in ascending order,
+        merged from the two encoded rows. :complexity: O(d) """
+        return _intersect(self.iter_successors(u), self.iter_predecessors(u))
+
+    def buffers(self) -> tuple:
+        """ Returns (out_offsets, out_bytes, in_offsets, in_bytes) as memoryviews. """
+        return self.__out_offsets, self.__out_bytes, self.__in_offsets, self.__in_bytes
+
+    def nbytes(self) -> int:
+        """ Returns the size of the four buffers in bytes. """
+        return sum(buffer.nbytes for buffer in self.buffers())
@@ -1,6 +1,203 @@
 import remote_server
 from data_structures import ArrayR    
 from data_structures import ArrayStack
+from data_structures import OrderStatisticTree
+from data_structures import LinearProbeTable
+
+# NumPy is optional: TipTops held as NumPy arrays are pinched with whole-array
+# operations when it is installed, ArrayR TipTops always in pure Python
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Colour caps applied by pinch_out. TipTops may arrive with blue values
+# outside 0..MAX_BLUE (HDR), which are counted apart (see _ViewedTipTop)
+MAX_RED = 255
+MAX_GREEN = 255
+MAX_BLUE = 200
+
+
+class _ViewedTipTop:
+    """
+    A TipTop opened in a session, with how many of its pixels have each blue
+    value: in an ArrayR for 0..MAX_BLUE, the only values pinch_out writes, and
+    in a hash table for any value outside that range. Its blueness, the number
+    of distinct blue values, is the number of non-zero counts and is kept up
+    to date as pixels change, so reading it is O(1) and a pixel edit costs O(1)
+    (expected, for values outside 0..MAX_BLUE) instead of a rescan.
+
+    The session also keeps here how many times it counted the TipTop as
+    viewed (views), the blueness it counted it with (recorded), and how many
+    places of its history (current, back and forward stacks) hold it.
+
+    The TipTop is an ArrayR of rows of [R, G, B] pixels, or, with NumPy
+    installed, an integer array of shape (rows, cols, 3).
+    """
+    def __init__(self, tiptop):
+        """
+        Time: O(P) where P is pixels in the tiptop.
+        """
+        self.tiptop = tiptop
+        self.blue_counts = ArrayR(MAX_BLUE + 1)
+        self.wide_blue_counts = LinearProbeTable()
+        self.recount()
+        self.views = 0
+        self.recorded = self.blueness
+        self.in_history = 0
+
+    def recount(self):
+        """
+        Count the blue values of every pixel again.
+
+        Time: O(P) expected where P is pixels in the tiptop.
+        """
+        for v in range(MAX_BLUE + 1):
+            self.blue_counts[v] = 0
+        self.wide_blue_counts.clear()
+        self.blueness = 0
+        tiptop = self.tiptop
+        if numpy is not None and isinstance(tiptop, numpy.ndarray):
+            self._shift_blues(tiptop[:, :, 2].ravel(), 1)
+            return
+        for row in range(len(tiptop)):
+            for col in range(len(tiptop[row])):
+                self.shift_blue(tiptop[row][col][2], 1)
+
+    def count(self, blue):
+        """
+        Number of pixels with the given blue value.
+
+        Time: O(1) expected
+        """
+        if 0 <= blue <= MAX_BLUE:
+            return self.blue_counts[blue]
+        return self.wide_blue_counts.get(blue, 0)
+
+    def shift_blue(self, blue, delta):
+        """
+        Add delta (possibly negative) to the number of pixels with the given blue value.
+
+        Time: O(1) expected
+        """
+        if 0 <= blue <= MAX_BLUE:
+            before = self.blue_counts[blue]
+            self.blue_counts[blue] = before + delta
+        else:
+            before = self.wide_blue_counts.get(blue, 0)
+            if before + delta == 0:
+                del self.wide_blue_counts[blue]
+            else:
+                self.wide_blue_counts[blue] = before + delta
+        if before == 0 and delta > 0:
+            self.blueness += 1
+        elif before > 0 and before + delta == 0:
+            self.blueness -= 1
+
+    def change_blue(self, old_blue, new_blue):
+        """
+        Record that one pixel's blue value went from old_blue to new_blue.
+
+        Time: O(1) expected
+        """
+        if 0 <= old_blue <= MAX_BLUE and 0 <= new_blue <= MAX_BLUE:
+            self.blue_counts[old_blue] -= 1
+            if self.blue_counts[old_blue] == 0:
+                self.blueness -= 1
+            self.blue_counts[new_blue] += 1
+            if self.blue_counts[new_blue] == 1:
+                self.blueness += 1
+        else:
+            self.shift_blue(old_blue, -1)
+            self.shift_blue(new_blue, 1)
+
+    def pinch_out(self, row, col, intensity):
+        """
+        Brighten the pixels within Manhattan distance intensity - 1 of
+        (row, col) by intensity - distance, capping R, G and B at MAX_RED,
+        MAX_GREEN and MAX_BLUE, and update the blue value counts.
+
+        Time: O(intensity^2), the pixels of the diamond
+        """
+        if intensity <= 0:
+            return
+        if numpy is not None and isinstance(self.tiptop, numpy.ndarray):
+            self._pinch_array(row, col, intensity)
+        else:
+            self._pinch_rows(row, col, intensity)
+
+    def _pinch_rows(self, row, col, intensity):
+        """
+        Pure-Python kernel: walk the diamond one row span at a time, so no
+        pixel outside it is visited and each row is looked up once.
+        """
+        tiptop = self.tiptop
+        rows = len(tiptop)
+        cols = len(tiptop[0]) if rows > 0 else 0
+        reach = intensity - 1
+        for r in range(max(0, row - reach), min(rows - 1, row + reach) + 1):
+            # this row gets base - |c - col| for |c - col| < base
+            base = intensity - abs(r - row)
+            pixels = tiptop[r]
+            for c in range(max(0, col - base + 1), min(cols - 1, col + base - 1) + 1):
+                increase = base - abs(c - col)
+                pixel = pixels[c]
+                red = pixel[0] + increase
+                pixel[0] = red if red < MAX_RED else MAX_RED
+                green = pixel[1] + increase
+                pixel[1] = green if green < MAX_GREEN else MAX_GREEN
+                old_blue = pixel[2]
+                blue = old_blue + increase
+                if blue > MAX_BLUE:
+                    blue = MAX_BLUE
+                if blue != old_blue:
+                    pixel[2] = blue
+                    self.change_blue(old_blue, blue)
+
+    def _pinch_array(self, row, col, intensity):
+        """
+        NumPy kernel: build the diamond's increases over its bounding box as
+        one array, add them to the box with the caps as an element-wise
+        minimum, and move the changed blue values between counts in bulk.
+        """
+        tiptop = self.tiptop
+        reach = intensity - 1
+        r0 = max(0, row - reach)
+        r1 = min(tiptop.shape[0], row + reach + 1)
+        c0 = max(0, col - reach)
+        c1 = min(tiptop.shape[1], col + reach + 1)
+        if r0 >= r1 or c0 >= c1:
+            return
+        distance = (numpy.abs(numpy.arange(r0, r1) - row)[:, None]
+                    + numpy.abs(numpy.arange(c0, c1) - col)[None, :])
+        increase = numpy.maximum(intensity - distance, 0)[:, :, None]
+
+        box = tiptop[r0:r1, c0:c1]
+        old = box.astype(numpy.int64)
+        caps = numpy.array((MAX_RED, MAX_GREEN, MAX_BLUE))
+        new = numpy.where(increase > 0, numpy.minimum(old + increase, caps), old)
+        box[...] = new
+
+        changed = old[:, :, 2] != new[:, :, 2]
+        if changed.any():
+            # either side may be outside 0..MAX_BLUE: caps only apply from above
+            self._shift_blues(old[:, :, 2][changed], -1)
+            self._shift_blues(new[:, :, 2][changed], 1)
+
+    def _shift_blues(self, blues, sign):
+        """
+        Add (sign 1) or take away (sign -1) one pixel for every value of the
+        NumPy array blues: those in 0..MAX_BLUE counted in bulk with bincount,
+        the others, possibly negative, grouped with unique.
+        """
+        narrow = (blues >= 0) & (blues <= MAX_BLUE)
+        counts = numpy.bincount(blues[narrow], minlength=MAX_BLUE + 1)
+        for v in numpy.flatnonzero(counts):
+            self.shift_blue(int(v), sign * int(counts[v]))
+        values, counts = numpy.unique(blues[~narrow], return_counts=True)
+        for k in range(len(values)):
+            self.shift_blue(int(values[k]), sign * int(counts[k]))
+
 
 class Session:
     """
@@ -22,8 +219,20 @@ class Session:
         # who is viewing
         self.username = username
 
-        # the TipTop currently open in this session (3D array)
-        self._current = starting_tiptop
+        # ----- 2.3 blueness state -----
+        # blueness of every view, in an order-statistic tree so the median and
+        # percentiles are selected by rank in O(log n) whatever the blue range
+        self._blue_views = OrderStatisticTree()
+        # number of *distinct* tiptops that have contributed to stats
+        self._n_viewed = 0
+        # cached median (float or int)
+        self._median_value = 0.0
+        # _ViewedTipTop of every TipTop in the history, by id(tiptop), so that
+        # opening a TipTop twice shares its counts and its recorded blueness
+        self._viewed = LinearProbeTable()
+
+        # the TipTop currently open in this session (3D array), with its blue value counts
+        self._current = self._open(starting_tiptop)
 
         # dynamic session limit provided by the app
         self._max_tiptops = max_tiptops_in_session
@@ -32,28 +241,12 @@ class Session:
         self._opened_count = 1
 
         # --- Minimal nav state (ready for Task 2.2) ---
-        # Back and forward stacks using ArrayR (no Python lists)
+        # Back and forward stacks of _ViewedTipTop using ArrayR (no Python lists)
         self._back_stack = ArrayR(1) 
         self._back_size = 0
 
         self._fwd_stack = ArrayR(1)  
         self._fwd_size = 0
-
-        # ----- 2.3 blueness state -----
-        # histogram for blueness values (0..201)
-        self._blue_hist = ArrayR(202)
-        for i in range(202):
-            self._blue_hist[i] = 0
-        # number of *distinct* tiptops that have contributed to stats
-        self._n_viewed = 0
-        # cached median (float or int)
-        self._median_value = 0.0
-
-        # add the initial tiptop’s blueness
-        b0 = self._compute_blueness(self._current)
-        self._blue_hist[b0] += 1
-        self._n_viewed = 1
-        self._recompute_median()
     
     def get_current_tiptop(self):
         """
@@ -61,7 +254,7 @@ class Session:
 
         Time complexity: O(1)
         """
-        return self._current
+        return self._current.tiptop
 
     def swipe_up(self, new_tiptop):
         """
@@ -69,7 +262,7 @@ class Session:
         - Push current into back stack.
         - Clear forward stack (can't redo after opening something new).
         - Set current to new_tiptop.
-        Time: Amortized O(1)
+        Time: Amortized O(1), plus O(P) to count the blue values of new_tiptop
         """
         # push current onto back stack
         if self._back_size == len(self._back_stack):
@@ -82,22 +275,21 @@ class Session:
         self._back_stack[self._back_size] = self._current
         self._back_size += 1
 
-        # clear forward stack (do not shrink capacity)
+        # count the new tiptop's blueness (2.3) before the forward stack lets go
+        # of its entries, so a TipTop reopened from there keeps its earlier views
+        opened = self._open(new_tiptop)
+
+        # clear forward stack (do not shrink capacity); each entry is cleared
+        # once after being pushed, so this stays amortized O(1)
+        for i in range(self._fwd_size):
+            self._leave_history(self._fwd_stack[i])
+            self._fwd_stack[i] = None
         self._fwd_size = 0
 
-        # set current to the new tiptop
-        self._current = new_tiptop
+        self._current = opened
 
         # opened unique tiptop count (assumption guarantees we won't exceed max)
         self._opened_count += 1
-
-        """
-        2.3: update blueness stats for this NEW tiptop
-        """
-        b = self._compute_blueness(new_tiptop)
-        self._blue_hist[b] += 1
-        self._n_viewed += 1
-        self._recompute_median()
     
     def swipe_right(self):
         """
@@ -156,6 +348,25 @@ class Session:
         if self._n_viewed == 0:
             return 0
         return self._median_value
+
+    def get_blueness_percentile(self, p):
+        """
+        Return the p-th percentile (0 <= p <= 100) of blueness over all viewed
+        TipTops, by nearest rank: the smallest blueness that at least p% of the
+        views do not exceed (the least blueness for p = 0).
+
+        Raises:
+            ValueError: if p is not between 0 and 100
+
+        Time: O(log n) for n views, an order-statistic select
+        """
+        if not 0 <= p <= 100:
+            raise ValueError("Percentile must be between 0 and 100.")
+        if self._n_viewed == 0:
+            return 0
+        # rank = ceil(p * n / 100), at least 1; exact for integer p
+        rank = max(1, int(-(-p * self._n_viewed // 100)))
+        return self._blue_views.select(rank)
     
     def pinch_out(self, row, col, intensity):
         """
@@ -165,6 +376,12 @@ class Session:
         increase by max(intensity - distance, 0) where distance is Manhattan distance.
         
         RGB values are capped at 255 for R and G, and 200 for B.
+
+        The blueness of the TipTop is kept up to date from its blue value
+        counts, which only change for the pixels inside the diamond, so the
+        cost is O(intensity^2) rather than a rescan of every pixel. The
+        diamond is brightened row span by row span in pure Python, or as
+        whole-array operations for a NumPy TipTop.
         
         Args:
             row: The row index of the pinch point
@@ -174,98 +391,30 @@ class Session:
         if intensity == 0:
             return
         
-        current_tiptop = self.get_current_tiptop()
-        rows = len(current_tiptop)
-        cols = len(current_tiptop[0]) if rows > 0 else 0
+        viewed = self._current
         
-        # Calculate old blueness before making changes
-        old_blueness = self._calculate_tiptop_blueness(current_tiptop)
+        # Blueness before making changes
+        old_blueness = viewed.blueness
         
-        # Calculate the range of pixels that will be affected
-        # Only need to check pixels within distance (intensity - 1) from the pinch point
-        min_row = max(0, row - (intensity - 1))
-        max_row = min(rows - 1, row + (intensity - 1))
-        min_col = max(0, col - (intensity - 1))
-        max_col = min(cols - 1, col + (intensity - 1))
+        # Apply brightness increase to the pixels of the diamond (see _ViewedTipTop.pinch_out)
+        viewed.pinch_out(row, col, intensity)
         
-        # Apply brightness increase to affected pixels
-        for r in range(min_row, max_row + 1):
-            for c in range(min_col, max_col + 1):
-                # Calculate Manhattan distance
-                distance = abs(r - row) + abs(c - col)
-                
-                # Calculate brightness increase for this pixel
-                brightness_increase = max(intensity - distance, 0)
-                
-                if brightness_increase > 0:
-                    pixel = current_tiptop[r][c]
-                    
-                    # Increase RGB values with proper capping
-                    pixel[0] = min(255, pixel[0] + brightness_increase)  # Red cap at 255
-                    pixel[1] = min(255, pixel[1] + brightness_increase)  # Green cap at 255  
-                    pixel[2] = min(200, pixel[2] + brightness_increase)  # Blue cap at 200
-        
-        # Calculate new blueness and update tracking if needed
-        new_blueness = self._calculate_tiptop_blueness(current_tiptop)
+        # New blueness, and update tracking if needed
+        new_blueness = viewed.blueness
         
         if new_blueness != old_blueness:
             # Update the blueness tracking for this TipTop
             # This assumes we have a blueness tracking system from task 2.3
             self._update_current_tiptop_blueness(old_blueness, new_blueness)
 
-    def _calculate_tiptop_blueness(self, tiptop):
-        """
-        Helper method to calculate the blueness (number of unique blue values) of a TipTop.
-        Uses a simple O(P^2) approach since we can't use sets or built-in collections.
-        """
-        rows = len(tiptop)
-        if rows == 0:
-            return 0
-        
-        cols = len(tiptop[0])
-        if cols == 0:
-            return 0
-        
-        # Since we can't use sets or lists, we'll use a simple O(P^2) approach
-        # to count unique blue values by checking each pixel against all previous pixels
-        unique_count = 0
-        
-        for r in range(rows):
-            for c in range(cols):
-                blue_value = tiptop[r][c][2]
-                is_unique = True
-                
-                # Check if we've seen this blue value before
-                for prev_r in range(rows):
-                    for prev_c in range(cols):
-                        # Stop checking when we reach the current pixel
-                        if prev_r == r and prev_c == c:
-                            break
-                        if prev_r > r or (prev_r == r and prev_c >= c):
-                            break
-                            
-                        if tiptop[prev_r][prev_c][2] == blue_value:
-                            is_unique = False
-                            break
-                    if not is_unique:
-                        break
-                
-                if is_unique:
-                    unique_count += 1
-        
-        return unique_count
-
     def _update_current_tiptop_blueness(self, old_blueness, new_blueness):
         """
-            Helper method to update the blueness tracking when the current TipTop's blueness changes.
-            This needs to be integrated with whatever blueness tracking system is implemented in task 2.3.
+        Helper method to update the blueness tracking when the current TipTop's
+        blueness changes from old_blueness to new_blueness.
+
+        Time: O(log n) for n views, see _record_blueness
         """
-        # This is a placeholder - the actual implementation depends on how blueness is tracked
-        # from task 2.3. You would need to:
-        # 1. Find the current TipTop in your blueness tracking structure
-        # 2. Update its blueness value from old_blueness to new_blueness
-        # 3. Recalculate the median if needed
-        pass
+        self._record_blueness(self._current, new_blueness)
 
     def post_comment(self, comment_length, comment_retriever):
         """
@@ -322,65 +471,62 @@ class Session:
         private utilities for 2.3
     """
 
-    def _recompute_median(self):
+    def _open(self, tiptop):
         """
-        Recompute and cache the median from the histogram.
-        Domain is fixed (0..201), so this is O(202) = O(1) constant time.
+        Count tiptop as viewed once more and return its _ViewedTipTop, shared
+        with the history if the TipTop is already in it. A TipTop opened again
+        is recounted, in case it was edited outside the session.
+
+        Time: O(P) where P is pixels in the tiptop.
         """
-        imput_n = self._n_viewed
-        # odd → the (n+1)//2 -th item; even → average of n//2 and n//2 + 1
-        if imput_n <= 0:
-            self._median_value = 0.0
+        viewed = self._viewed.get(id(tiptop))
+        if viewed is None:
+            viewed = _ViewedTipTop(tiptop)
+            self._viewed[id(tiptop)] = viewed
+        else:
+            viewed.recount()
+            self._record_blueness(viewed, viewed.blueness)
+        viewed.in_history += 1
+        viewed.views += 1
+        self._blue_views.add(viewed.recorded)
+        self._n_viewed += 1
+        self._recompute_median()
+        return viewed
+
+    def _leave_history(self, viewed):
+        """
+        Forget one place of the history holding viewed. Its views stay in the
+        statistics with the blueness they were last recorded with.
+
+        Time: O(1) expected
+        """
+        viewed.in_history -= 1
+        if viewed.in_history == 0:
+            del self._viewed[id(viewed.tiptop)]
+
+    def _record_blueness(self, viewed, blueness):
+        """
+        Move every view of a TipTop from the blueness recorded for it to
+        blueness, and refresh the median. No other TipTop is rescanned.
+
+        Time: O(log n) for n views, the tree holding each blueness with its
+        number of views
+        """
+        if blueness == viewed.recorded:
             return
+        self._blue_views.remove(viewed.recorded, viewed.views)
+        self._blue_views.add(blueness, viewed.views)
+        viewed.recorded = blueness
+        self._recompute_median()
 
-        if (imput_n % 2) == 1:
-            target = (imput_n + 1) // 2
-            cum = 0
-            for v in range(202):
-                cum += self._blue_hist[v]
-                if cum >= target:
-                    # exact value
-                    self._median_value = float(v)
-                    return
-        else:
-            t1 = imput_n // 2
-            t2 = t1 + 1
-            cum = 0
-            m1 = None
-            m2 = None
-            for v in range(202):
-                cum += self._blue_hist[v]
-                if (m1 is None) and (cum >= t1):
-                    m1 = v
-                if cum >= t2:
-                    m2 = v
-                    break
-            # average; e.g., may produce .5 like 2.5 (matches example)
-            self._median_value = (m1 + m2) / 2.0
-
-    def _compute_blueness(self, tiptop):
-        """
-        Count unique Blue values (index 2) across all pixels.
-        Blue values in sessions are capped at 200, so domain = 0..200.
+    def _recompute_median(self):
+        """
+        Recompute and cache the median of the views' blueness: the middle one,
+        or the average of the two middle ones for an even count.
 
-        Time: O(P) where P is pixels in the tiptop.
+        Time: O(log n) for n views
         """
-        # seen[0..200] = 0/1
-        seen = ArrayR(201)
-        for i in range(201):
-            seen[i] = 0
-
-        R = len(tiptop)
-        C = len(tiptop[0])
-
-        count_unique = 0
-        for row in range(R):
-            for col in range(C):
-                ans_gurr = tiptop[row][col][2]      # 0..200 guaranteed per spec
-                if seen[ans_gurr] == 0:
-                    seen[ans_gurr] = 1
-                    count_unique += 1
-        return count_unique
+        self._median_value = self._blue_views.median()
 
 if __name__ == "__main__":
     # Write tests for your code here...
@@ -4,7 +4,7 @@ import inspect
 
 from tests.helper import CollectionsFinder
 
-from data_structures import ArrayR
+from data_structures import ArrayR, OrderStatisticTree
 from session import Session
 
 
@@ -48,7 +48,208 @@ class TestTask2(TestTask2Setup):
         
         s.swipe_up(new_tiptop)
         self.assertEqual(from_array(s.get_current_tiptop()), [[[0, 255, 0]]])
-    
+
+    def test_pinch_out_blueness(self):
+        """
+        #name(Pinch out keeps the TipTop's blue value counts up to date)
+        """
+        s = Session("test_user", to_array([[[0, 0, 10], [0, 0, 10], [0, 0, 12]],
+                                           [[250, 0, 11], [0, 0, 199], [0, 0, 13]]]), 10)
+        self.assertEqual(s._current.blueness, 5)
+
+        s.pinch_out(1, 1, 2)
+        self.assertEqual(from_array(s.get_current_tiptop()),
+                         [[[0, 0, 10], [1, 1, 11], [0, 0, 12]],
+                          [[251, 1, 12], [2, 2, 200], [1, 1, 14]]])
+        # 10, 11, 12, 14 and 200; 13 and 199 are gone
+        self.assertEqual(s._current.blueness, 5)
+        self.assertEqual(s._current.blue_counts[12], 2)
+
+    def test_pinch_out_updates_median(self):
+        """
+        #name(Pinch out refreshes the session blueness of every view of the TipTop)
+        """
+        a = to_array([[[0, 0, 1], [0, 0, 1], [0, 0, 1]]])
+        b = to_array([[[0, 0, 1], [0, 0, 2]]])
+        c = to_array([[[0, 0, 1], [0, 0, 2], [0, 0, 3], [0, 0, 4]]])
+        s = Session("test_user", a, 10)
+        s.swipe_up(b)
+        s.swipe_up(c)
+        s.swipe_up(a)
+        self.assertEqual(s.get_blueness(), 1.5)      # 1, 2, 4, 1
+
+        # a's blues become 2, 3, 4 while open; both of its views change
+        s.pinch_out(0, 2, 3)
+        self.assertEqual(from_array(a), [[[1, 1, 2], [2, 2, 3], [3, 3, 4]]])
+        self.assertEqual(s.get_blueness(), 3.0)      # 3, 2, 4, 3
+
+        # back on c, which is edited on its own
+        s.swipe_right()
+        s.pinch_out(0, 0, 2)
+        self.assertEqual(s.get_blueness(), 2.5)      # 3, 2, 2, 3
+
+        # b reopened from the forward stack keeps its first view, with or
+        # without going back in between
+        for go_back in (False, True):
+            a = to_array([[[0, 0, 1]]])
+            b = to_array([[[0, 0, 5], [0, 0, 5]]])
+            s = Session("test_user", a, 10)
+            s.swipe_up(b)
+            if go_back:
+                s.swipe_right()
+            s.swipe_up(b)
+            s.pinch_out(0, 1, 2)                     # b's blues become 6 and 7
+            self.assertEqual(s.get_blueness(), 2.0)  # 1, 2, 2
+
+    def test_hdr_blueness(self):
+        """
+        #name(Blue values above 200 are counted like any other)
+        """
+        s = Session("test_user", to_array([[[0, 0, v] for v in range(300)]]), 10)
+        self.assertEqual(s.get_blueness(), 300)
+
+        s.swipe_up(to_array([[[0, 0, 1000], [0, 0, 700], [0, 0, 700], [0, 0, 150]]]))
+        self.assertEqual(s._current.blueness, 3)
+        self.assertEqual(s._current.count(700), 2)
+        self.assertEqual(s.get_blueness(), (300 + 3) / 2)
+
+        # the pinch caps one 700 at 200 and raises 150 to 152
+        s.pinch_out(0, 3, 2)
+        self.assertEqual(from_array(s.get_current_tiptop()),
+                         [[[0, 0, 1000], [0, 0, 700], [1, 1, 200], [2, 2, 152]]])
+        self.assertEqual(s._current.blueness, 4)
+        self.assertEqual(s.get_blueness(), (300 + 4) / 2)
+        self.assertEqual(s.get_blueness_percentile(100), 300)
+
+    def test_pinch_out_kernels(self):
+        """
+        #name(Pinch out row-span and NumPy kernels agree)
+        """
+        pixels = [[[(7 * r + c) % 256, (250 + r) % 256, (40 * r + 9 * c) % 201] for c in range(9)] for r in range(7)]
+        pinches = [(3, 4, 5), (0, 0, 3), (6, 8, 60), (-2, 4, 4), (3, 12, 2), (3, 4, 0)]
+        s = Session("test_user", to_array(pixels), 10)
+        for row, col, intensity in pinches:
+            s.pinch_out(row, col, intensity)
+        result = from_array(s.get_current_tiptop())
+
+        # brute force over the whole image
+        for row, col, intensity in pinches:
+            for r in range(7):
+                for c in range(9):
+                    increase = max(intensity - abs(r - row) - abs(c - col), 0)
+                    if increase > 0:
+                        pixel = pixels[r][c]
+                        pixel[0] = min(255, pixel[0] + increase)
+                        pixel[1] = min(255, pixel[1] + increase)
+                        pixel[2] = min(200, pixel[2] + increase)
+        self.assertEqual(result, pixels)
+        self.assertEqual(s._current.blueness, len({p[2] for line in pixels for p in line}))
+
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("NumPy is not installed")
+        original = [[[(7 * r + c) % 256, (250 + r) % 256, (40 * r + 9 * c) % 201] for c in range(9)] for r in range(7)]
+        array_session = Session("test_user", numpy.array(original, dtype=numpy.uint8), 10)
+        for row, col, intensity in pinches:
+            array_session.pinch_out(row, col, intensity)
+        self.assertEqual(array_session.get_current_tiptop().tolist(), pixels)
+        self.assertEqual(array_session.get_blueness(), s.get_blueness())
+
+        # signed blues: pinches raise negative ones without capping them, and
+        # both kernels count them apart from 0..200
+        signed = [[[0, 0, (37 * r + 11 * c) % 50 - 25] for c in range(9)] for r in range(7)]
+        pinches = [(3, 4, 5), (0, 8, 4), (6, 0, 3)]
+        row_session = Session("test_user", to_array(signed), 10)
+        array_session = Session("test_user", numpy.array(signed, dtype=numpy.int16), 10)
+        for row, col, intensity in pinches:
+            row_session.pinch_out(row, col, intensity)
+            array_session.pinch_out(row, col, intensity)
+        result = from_array(row_session.get_current_tiptop())
+        self.assertEqual(array_session.get_current_tiptop().tolist(), result)
+        blues = {p[2] for line in result for p in line}
+        self.assertTrue(any(blue < 0 for blue in blues))
+        self.assertEqual(row_session._current.blueness, len(blues))
+        self.assertEqual(array_session._current.blueness, len(blues))
+        for blue in blues:
+            self.assertEqual(array_session._current.count(blue), row_session._current.count(blue))
+
+    def test_blueness_percentiles(self):
+        """
+        #name(Blueness percentiles by nearest rank)
+        """
+        s = Session("test_user", to_array([[[0, 0, 0]]]), 20)
+        for blueness in [4, 2, 3, 1, 2, 5, 2, 1, 3]:
+            s.swipe_up(to_array([[[0, 0, v] for v in range(blueness)]]))
+        # views: 1, 1, 1, 2, 2, 2, 3, 3, 4, 5
+        self.assertEqual(s.get_blueness(), 2.0)
+        self.assertEqual(s.get_blueness_percentile(0), 1)
+        self.assertEqual(s.get_blueness_percentile(30), 1)
+        self.assertEqual(s.get_blueness_percentile(31), 2)
+        self.assertEqual(s.get_blueness_percentile(90), 4)
+        self.assertEqual(s.get_blueness_percentile(99), 5)
+        self.assertEqual(s.get_blueness_percentile(100), 5)
+        with self.assertRaises(ValueError):
+            s.get_blueness_percentile(101)
+
+    def test_streaming_median(self):
+        """
+        #name(Order-statistic tree median over an unbounded domain)
+        """
+        tree = OrderStatisticTree()
+        values = [70000, -3, 5000, 12, 12, 999999, 0, 12]
+        for v in values:
+            tree.add(v)
+        self.assertEqual(len(tree), 8)
+        self.assertEqual(tree.median(), 12.0)
+        self.assertEqual(tree.select(1), -3)
+        self.assertEqual(tree.select(8), 999999)
+        self.assertEqual(tree.rank(12), 2)
+
+        tree.remove(12)
+        tree.remove(12)
+        self.assertEqual(tree.median(), (12 + 5000) / 2)
+        tree.remove(999999)
+        self.assertEqual(tree.median(), 12.0)
+        tree.remove(-3)
+        self.assertEqual(tree.median(), (12 + 5000) / 2)
+        with self.assertRaises(ValueError):
+            tree.remove(-3)
+
+        # sorted insertions keep the tree shallow
+        for v in range(1000):
+            tree.add(v)
+        depth = 0
+        node = tree._OrderStatisticTree__root
+        while node is not None:
+            node = node._left
+            depth += 1
+        self.assertLess(depth, 20)
+
+    def test_streaming_median_counts(self):
+        """
+        #name(Order-statistic tree moves many copies of a key at once)
+        """
+        tree = OrderStatisticTree()
+        tree.add(0, 4)
+        tree.add(10)
+        tree.add(7, 2)
+        self.assertEqual(len(tree), 7)
+        self.assertEqual(tree.count(0), 4)
+        self.assertEqual(tree.select(4), 0)
+        self.assertEqual(tree.select(5), 7)
+        self.assertEqual(tree.rank(10), 6)
+        self.assertEqual(tree.median(), 0.0)
+
+        tree.remove(0, 3)
+        self.assertEqual(tree.median(), 7.0)
+        with self.assertRaises(ValueError):
+            tree.remove(7, 3)
+        self.assertEqual(tree.count(7), 2)
+        tree.remove(7, 2)
+        self.assertNotIn(7, tree)
+        self.assertEqual(tree.median(), 5.0)
+
 
 
 class TestTask2Approach(TestTask2Setup):
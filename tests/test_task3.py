@@ -1,6 +1,9 @@
 from unittest import TestCase
 import ast
 import inspect
+import io
+import os
+import tempfile
 
 from tests.helper import CollectionsFinder
 
@@ -48,9 +51,434 @@ class TestTask3(TestTask3Setup):
         self.assertTrue(conn.mutual_friends("bob", "alice"))
         self.assertFalse(conn.mutual_friends("alice", "charlie"))
         self.assertFalse(conn.mutual_friends("charlie", "bob"))
+
+    def test_user_index_lookup(self):
+        """
+        #name(Username directory lookups)
+        """
+        usernames = [f"user{i}" for i in range(100)]
+        connections = [[] for _ in usernames]
+
+        conn = Connections(to_array(usernames), to_array(connections))
+
+        for i, username in enumerate(usernames):
+            self.assertEqual(conn._get_user_index(username), i)
+        self.assertEqual(conn._get_user_index("nobody"), -1)
+
+    def test_bitset_adjacency(self):
+        """
+        #name(Bitset adjacency mode agrees with list scans)
+        """
+        usernames = ["alice", "bob", "charlie", "dave"]
+        connections = [
+            ["bob", "charlie"],
+            ["alice", "charlie"],
+            ["dave"],
+            ["charlie"],
+        ]
+
+        plain = Connections(to_array(usernames), to_array(connections))
+        bits = Connections(to_array(usernames), to_array(connections), bitset_adjacency=True)
+
+        for a in usernames:
+            self.assertEqual(plain._is_bot(a), bits._is_bot(a))
+            for b in usernames:
+                self.assertEqual(plain.mutual_friends(a, b), bits.mutual_friends(a, b))
+        # charlie is followed by alice and bob but only follows dave back
+        self.assertTrue(bits._is_followed_by(2, 0))
+        self.assertFalse(bits._follows(2, 0))
+        self.assertEqual(bits._mutual_bits(2), 1 << 3)
+
+    def test_bots_and_clusters_1008(self):
+        """
+        #name(Bot detection and 1008/2085 clusters)
+        """
+        usernames = ["bot", "a", "b", "fan", "c"]
+        connections = [
+            ["a", "b"],
+            ["bot"],
+            ["bot", "c"],
+            ["c"],
+            ["b"],
+        ]
+
+        conn = Connections(to_array(usernames), to_array(connections))
+
+        # fan follows c one-sidedly, so neither of them is a bot
+        self.assertEqual(from_array(conn.bots()), ["bot", "a", "b"])
+        clusters = [from_array(cluster) for cluster in conn.get_ai_clusters_1008_2085()]
+        self.assertEqual(clusters, [["bot", "a", "b"]])
+
+    def test_clusters_1054(self):
+        """
+        #name(1054 clusters are closed cliques of mutual friends)
+        """
+        usernames = ["a", "b", "c", "d", "e", "f", "g"]
+        connections = [
+            ["c", "b"],
+            ["a", "c"],
+            ["a", "b"],
+            ["e"],          # d-e-f is a chain, not a clique
+            ["d", "f"],
+            ["e"],
+            ["a"],          # g follows into the a-b-c clique one-sidedly
+        ]
+
+        conn = Connections(to_array(usernames), to_array(connections))
+
+        clusters = [from_array(cluster) for cluster in conn.get_ai_clusters_1054()]
+        self.assertEqual(clusters, [["a", "b", "c"]])
+
+    def test_csr_backend(self):
+        """
+        #name(CSR backend matches the list backend)
+        """
+        usernames = ["a", "b", "c", "d", "e"]
+        connections = [["c", "b", "b"], ["a", "c"], ["b", "a"], ["e"], ["a"]]
+
+        lists = Connections(to_array(usernames), to_array(connections))
+        csr = Connections(to_array(usernames), to_array(connections), backend="csr")
+
+        for a in usernames:
+            for b in usernames:
+                self.assertEqual(lists.mutual_friends(a, b), csr.mutual_friends(a, b))
+        self.assertEqual(from_array(csr.bots()), from_array(lists.bots()))
+        self.assertEqual([from_array(c) for c in csr.get_ai_clusters_1054()], [["a", "b", "c"]])
+        self.assertEqual([from_array(c) for c in csr.get_ai_clusters_1008_2085()],
+                         [from_array(c) for c in lists.get_ai_clusters_1008_2085()])
+
+        # editing switches the CSR graph to lists
+        csr.follow("e", "d")
+        self.assertTrue(csr.mutual_friends("d", "e"))
+        with self.assertRaises(ValueError):
+            Connections(to_array(usernames), to_array(connections), backend="matrix")
+
+    def test_snapshot_round_trip(self):
+        """
+        #name(Snapshots reopen with the same answers)
+        """
+        usernames = ["a", "b", "c", "d"]
+        connections = [["b"], ["a"], ["d"], []]
+        conn = Connections(to_array(usernames), to_array(connections))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "connections.snapshot")
+            conn.write_snapshot(path)
+            opened = Connections.open_snapshot(path)
+
+            self.assertEqual(opened.num_users, 4)
+            self.assertEqual(from_array(opened.usernames), usernames)
+            self.assertTrue(opened.mutual_friends("a", "b"))
+            self.assertFalse(opened.mutual_friends("c", "d"))
+            self.assertEqual(from_array(opened.bots()), from_array(conn.bots()))
+            self.assertEqual([from_array(c) for c in opened.get_ai_clusters_1054()], [["a", "b"], ["d"]])
+
+            # edits copy the snapshot into memory
+            opened.follow("d", "c")
+            self.assertTrue(opened.mutual_friends("c", "d"))
+            del opened
+
+    def test_live_edits(self):
+        """
+        #name(Bots and clusters follow edits to the graph)
+        """
+        usernames = ["a", "b", "c"]
+        connections = [["b"], ["a"], ["a"]]
+
+        conn = Connections(to_array(usernames), to_array(connections))
+        self.assertEqual([from_array(c) for c in conn.get_ai_clusters_1054()], [["a", "b"]])
+        self.assertEqual(from_array(conn.bots()), ["b"])
+
+        # a and c become mutual friends, but b and c do not follow each other yet
+        conn.follow("a", "c")
+        self.assertEqual([from_array(c) for c in conn.get_ai_clusters_1054()], [])
+        conn.follow("b", "c")
+        conn.follow("c", "b")
+        self.assertEqual([from_array(c) for c in conn.get_ai_clusters_1054()], [["a", "b", "c"]])
+        self.assertEqual(from_array(conn.bots()), ["a", "b", "c"])
+
+        conn.add_user("d")
+        conn.follow("d", "a")
+        self.assertEqual([from_array(c) for c in conn.get_ai_clusters_1054()], [["a", "b", "c"]])
+        self.assertEqual(from_array(conn.bots()), ["b", "c"])
+
+        conn.unfollow("a", "b")
+        self.assertEqual([from_array(c) for c in conn.get_ai_clusters_1054()], [])
+
+        conn.remove_user("b")
+        self.assertEqual([from_array(c) for c in conn.get_ai_clusters_1054()], [["a", "c"]])
+        self.assertEqual(from_array(conn.get_ai_clusters_1008_2085()[0]), ["c", "a"])
+        with self.assertRaises(ValueError):
+            conn.mutual_friends("a", "b")
+        with self.assertRaises(ValueError):
+            conn._is_bot("b")
+        with self.assertRaises(ValueError):
+            conn.follow("a", "b")
     
 
 
+    def test_parallel_scan(self):
+        """
+        #name(Process-pool scan gives the serial clusters)
+        """
+        usernames = ["a", "b", "c", "d", "e", "f", "g"]
+        connections = [["c", "b"], ["a", "c"], ["b", "a"], ["e"], ["d", "f"], ["e"], []]
+
+        pooled = Connections(to_array(usernames), to_array(connections), workers=2)
+        self.assertEqual([from_array(c) for c in pooled.get_ai_clusters_1054()], [["a", "b", "c"], ["g"]])
+
+        serial = Connections(to_array(usernames), to_array(connections))
+        serial.remove_user("g")
+        for workers in (2, 3):
+            self.assertEqual([from_array(c) for c in serial.get_ai_clusters_1054(workers=workers)],
+                             [["a", "b", "c"]])
+            self.assertEqual([from_array(c) for c in serial.get_ai_clusters_1008_2085(workers=workers)],
+                             [from_array(c) for c in serial.get_ai_clusters_1008_2085()])
+        with self.assertRaises(ValueError):
+            Connections(to_array(usernames), to_array(connections), workers=0)
+
+    def test_cluster_generators(self):
+        """
+        #name(Cluster generators yield the query results one by one)
+        """
+        usernames = ["a", "b", "c", "d", "e", "f"]
+        connections = [["b"], ["a"], ["d"], ["c"], ["f"], []]
+        conn = Connections(to_array(usernames), to_array(connections))
+
+        clusters = conn.iter_ai_clusters_1054()
+        self.assertEqual(from_array(next(clusters)), ["a", "b"])
+        self.assertEqual([from_array(c) for c in clusters], [["c", "d"], ["f"]])
+
+        clusters = conn.iter_ai_clusters_1008_2085()
+        self.assertEqual(from_array(next(clusters)), ["a", "b"])
+        self.assertEqual([from_array(c) for c in clusters],
+                         [from_array(c) for c in conn.get_ai_clusters_1008_2085()][1:])
+
+
+    def test_mutual_friends_many(self):
+        """
+        #name(Batch mutual friend queries)
+        """
+        usernames = ["alice", "bob", "charlie", "dave"]
+        connections = [["bob", "charlie"], ["alice", "charlie"], ["dave"], ["charlie"]]
+        pairs = [("charlie", "dave"), ("alice", "bob"), ("alice", "charlie"), ("bob", "alice"),
+                 ("dave", "alice"), ("alice", "bob")]
+
+        for bitset_adjacency in (False, True):
+            conn = Connections(to_array(usernames), to_array(connections), bitset_adjacency=bitset_adjacency)
+            answers = conn.mutual_friends_many(pairs)
+            self.assertEqual(answers.tolist(), [int(conn.mutual_friends(a, b)) for a, b in pairs])
+            self.assertEqual(answers.tolist(), [1, 1, 0, 1, 0, 1])
+        self.assertEqual(len(conn.mutual_friends_many([])), 0)
+        with self.assertRaises(ValueError):
+            conn.mutual_friends_many([("alice", "eve")])
+
+        # batches between yields do not disturb the cluster generator
+        conn = Connections(to_array(["a", "b", "c"]), to_array([["c"], ["c"], ["a", "b"]]))
+        clusters = conn.iter_ai_clusters_1008_2085()
+        self.assertEqual(from_array(next(clusters)), ["a", "c"])
+        self.assertEqual(conn.mutual_friends_many([("a", "c"), ("a", "b")]).tolist(), [1, 0])
+        self.assertEqual([from_array(c) for c in clusters], [["b"]])
+
+    def test_query_cache(self):
+        """
+        #name(Cluster and bot queries are cached until the graph changes)
+        """
+        conn = Connections(to_array(["a", "b", "c"]), to_array([["b"], ["a"], []]))
+
+        first = conn.get_ai_clusters_1054()
+        self.assertIs(conn.get_ai_clusters_1054(), first)
+        conn.bots()
+        conn.bots()
+        self.assertEqual((conn.cache_hits, conn.cache_misses), (2, 2))
+
+        version = conn.version
+        conn.follow("a", "b")  # already followed: nothing changes
+        self.assertEqual(conn.version, version)
+        self.assertIs(conn.get_ai_clusters_1054(), first)
+
+        conn.follow("a", "c")
+        self.assertGreater(conn.version, version)
+        self.assertEqual([from_array(c) for c in conn.get_ai_clusters_1054()], [["c"]])
+        self.assertEqual(from_array(conn.bots()), ["b"])
+        self.assertEqual((conn.cache_hits, conn.cache_misses), (3, 4))
+
+    def test_k_hop_and_reachable(self):
+        """
+        #name(k-hop audiences and reachability)
+        """
+        usernames = ["a", "b", "c", "d", "e"]
+        # a -> b <-> c -> d, e -> a
+        connections = [["b"], ["c"], ["b", "d"], [], ["a"]]
+        conn = Connections(to_array(usernames), to_array(connections))
+
+        self.assertEqual(from_array(conn.k_hop("a", 0)), [])
+        self.assertEqual(from_array(conn.k_hop("a", 2)), ["b", "c"])
+        self.assertEqual(from_array(conn.k_hop("e", 10)), ["a", "b", "c", "d"])
+        self.assertEqual(from_array(conn.k_hop("b", 5, mutual_only=True)), ["c"])
+
+        for bidirectional in (True, False):
+            self.assertTrue(conn.reachable("e", "d", 4, bidirectional=bidirectional))
+            self.assertFalse(conn.reachable("e", "d", 3, bidirectional=bidirectional))
+            self.assertFalse(conn.reachable("d", "a", 10, bidirectional=bidirectional))
+            self.assertFalse(conn.reachable("a", "c", 5, mutual_only=True, bidirectional=bidirectional))
+        with self.assertRaises(ValueError):
+            conn.k_hop("a", -1)
+
+    def test_strongly_connected_components(self):
+        """
+        #name(Follow rings and the condensation DAG)
+        """
+        usernames = ["a", "b", "c", "d", "e", "f"]
+        # a -> b -> c -> a is a one-directional ring, d <-> e a pair, f follows the ring
+        connections = [["b"], ["c"], ["a", "d"], ["e"], ["d"], ["a"]]
+        conn = Connections(to_array(usernames), to_array(connections))
+
+        component, sizes = conn.strongly_connected_components()
+        self.assertEqual(sorted(sizes), [1, 2, 3])
+        self.assertEqual([from_array(r) for r in conn.follow_rings()], [["a", "b", "c"], ["d", "e"]])
+        self.assertEqual([from_array(r) for r in conn.follow_rings(3)], [["a", "b", "c"]])
+
+        dag = conn.condensation()
+        self.assertEqual(len(dag), 3)
+        self.assertEqual(dag.number_of_edges(), 2)
+        self.assertTrue(dag.has_edge(component[5], component[0]))
+        self.assertTrue(dag.has_edge(component[2], component[3]))
+
+    def test_core_numbers(self):
+        """
+        #name(Core numbers over mutual friendships)
+        """
+        usernames = ["a", "b", "c", "d", "e", "f"]
+        # a, b, c, d are all mutual friends, e is a mutual friend of d only,
+        # and f follows a without being followed back
+        connections = [["b", "c", "d"], ["a", "c", "d"], ["a", "b", "d"], ["a", "b", "c", "e"], ["d"], ["a"]]
+        conn = Connections(to_array(usernames), to_array(connections))
+
+        self.assertEqual(conn.core_numbers().tolist(), [3, 3, 3, 3, 1, 0])
+        self.assertEqual(from_array(conn.top_core(2)), [("a", 3), ("b", 3)])
+        conn.unfollow("a", "b")
+        self.assertEqual(conn.core_numbers().tolist(), [2, 2, 2, 2, 1, 0])
+        with self.assertRaises(ValueError):
+            conn.top_core(0)
+
+    def test_triangles(self):
+        """
+        #name(Triangle counts and clustering coefficients)
+        """
+        usernames = ["a", "b", "c", "d", "e"]
+        # a, b, c, d are all mutual friends except c and d; e is a mutual friend of a
+        connections = [["b", "c", "d", "e"], ["a", "c", "d"], ["a", "b"], ["a", "b"], ["a"]]
+        conn = Connections(to_array(usernames), to_array(connections))
+
+        self.assertEqual(conn.triangle_counts().tolist(), [2, 2, 1, 1, 0])
+        self.assertEqual(conn.clustering_coefficients().tolist(), [2 / 6, 2 / 3, 1.0, 1.0, 0.0])
+
+        conn.follow("c", "d")
+        conn.follow("d", "c")
+        conn.unfollow("a", "e")
+        conn.unfollow("e", "a")
+        for use_triangles in (False, True):
+            self.assertTrue(conn._is_valid_cluster_1054(["a", "b", "c", "d"], use_triangles))
+            self.assertFalse(conn._is_valid_cluster_1054(["a", "b", "c"], use_triangles))
+            with self.assertRaises(ValueError):
+                conn._is_valid_cluster_1054(["a", "zed"], use_triangles)
+
+    def test_suggest(self):
+        """
+        #name(Friend suggestions ranked by shared mutual friends)
+        """
+        usernames = ["a", "b", "c", "d", "e"]
+        connections = [["b", "c"], ["a", "c", "d", "e"], ["a", "b", "d"], ["b", "c"], ["b"]]
+        conn = Connections(to_array(usernames), to_array(connections))
+
+        # d shares b and c with a, e only b
+        self.assertEqual(from_array(conn.suggest("a", 5)), [("d", 2), ("e", 1)])
+        self.assertEqual(from_array(conn.suggest("a", 1)), [("d", 2)])
+        # e already follows b, and b's other mutual friends share only b with e
+        self.assertEqual(from_array(conn.suggest("e", 2)), [("a", 1), ("c", 1)])
+        self.assertEqual([from_array(s) for s in conn.suggest_many(["a", "e"], 1)], [[("d", 2)], [("a", 1)]])
+        with self.assertRaises(ValueError):
+            conn.suggest("a", 0)
+
+        # suggestions between yields do not disturb the cluster generator
+        conn = Connections(to_array(["a", "b", "c"]), to_array([["c"], ["c"], ["a", "b"]]))
+        clusters = conn.iter_ai_clusters_1008_2085()
+        self.assertEqual(from_array(next(clusters)), ["a", "c"])
+        self.assertEqual(from_array(conn.suggest("a", 1)), [("b", 1)])
+        self.assertEqual([from_array(c) for c in clusters], [["b"]])
+
+    def test_minhash(self):
+        """
+        #name(MinHash estimates of follow-list similarity)
+        """
+        usernames = ["a", "b", "c", "d", "e", "f"] + [f"x{i}" for i in range(20)]
+        shared = [f"x{i}" for i in range(20)]
+        connections = [shared, shared, shared[:10], shared[10:], [], ["a"]] + [[] for _ in range(20)]
+        conn = Connections(to_array(usernames), to_array(connections))
+
+        # identical follow lists agree everywhere, disjoint ones nowhere
+        self.assertEqual(conn.estimate_jaccard("a", "b"), 1.0)
+        self.assertEqual(conn.estimate_jaccard("c", "d"), 0.0)
+        self.assertEqual(conn.estimate_jaccard("a", "e"), 0.0)
+        self.assertAlmostEqual(conn.estimate_jaccard("a", "c"), 0.5, delta=0.25)
+        self.assertEqual(from_array(conn.similar_users("a", 0.9)), [("b", 1.0)])
+        self.assertEqual(from_array(conn.similar_users("e")), [])
+        self.assertEqual(from_array(conn.near_duplicates(0.9)), [("a", "b", 1.0)])
+        self.assertIs(conn.minhash_index(), conn.minhash_index())
+        with self.assertRaises(ValueError):
+            conn.minhash_index(num_hashes=30, bands=4)
+
+    def test_from_edge_list(self):
+        """
+        #name(Streaming an edge list into Connections)
+        """
+        edges = b"# follower\tfollowee\na\tb\nb\ta\r\n\nb\tc\nc\td\nd\tc\na\tb\ne\tf"
+        for backend in ["csr", "lists"]:
+            conn = Connections.from_edge_list(io.BytesIO(edges), backend=backend, chunk_size=5)
+            self.assertEqual(from_array(conn.usernames), ["a", "b", "c", "d", "e", "f"])
+            self.assertTrue(conn.mutual_friends("a", "b"))
+            self.assertFalse(conn.mutual_friends("b", "c"))
+            self.assertEqual(conn._graph.number_of_edges(), 6)
+            # b follows c one-sided, so only {c, d} and the followed-only f are clusters
+            self.assertEqual([from_array(c) for c in conn.get_ai_clusters_1054()], [["c", "d"], ["f"]])
+        conn.follow("f", "e")
+        self.assertTrue(conn.mutual_friends("e", "f"))
+
+        with self.assertRaises(ValueError):
+            Connections.from_edge_list(io.BytesIO(b"a b\n"))
+        with self.assertRaises(ValueError):
+            Connections.from_edge_list(io.BytesIO(b"a\ta\n"))
+
+    def test_varint_backend(self):
+        """
+        #name(Delta-varint backend matches the CSR backend)
+        """
+        usernames = [f"u{i}" for i in range(300)]
+        # gaps of every varint length, from 1 to over 128
+        connections = [[f"u{(i * 7 + j * j) % 300}" for j in range(1, 20) if (i * 7 + j * j) % 300 != i]
+                       for i in range(300)]
+        connections[5] = []
+        csr = Connections(to_array(usernames), to_array(connections), backend="csr")
+        varint = Connections(to_array(usernames), to_array(connections), backend="varint")
+
+        for i in range(300):
+            self.assertEqual(list(varint._graph.successors(i)), list(csr._graph.successors(i)))
+            self.assertEqual(list(varint._graph.predecessors(i)), list(csr._graph.predecessors(i)))
+            self.assertEqual(list(varint._mutual_row(i)), list(csr._mutual_row(i)))
+        self.assertEqual(varint._graph.number_of_edges(), csr._graph.number_of_edges())
+        self.assertLess(varint._graph.nbytes(), csr._graph.nbytes())
+        for a in usernames[:40]:
+            for b in usernames[:40]:
+                self.assertEqual(varint.mutual_friends(a, b), csr.mutual_friends(a, b))
+        self.assertEqual(from_array(varint.suggest("u1", 3)), from_array(csr.suggest("u1", 3)))
+        self.assertEqual([from_array(c) for c in varint.get_ai_clusters_1054()],
+                         [from_array(c) for c in csr.get_ai_clusters_1054()])
+
+        varint.follow("u5", "u6")
+        self.assertTrue(varint._follows(5, 6))
+
+
 class TestTask3Approach(TestTask3Setup):
     def test_python_built_ins_not_used(self):
         """